@@ -2,7 +2,6 @@
 import folium
 from core.engine.renderers.truecolor_map import TrueColorRenderer, TrueColorOptions
 from core.engine.renderers.index_map import IndexMapRenderer, IndexMapOptions
-from core.engine.renderers.raster import generate_rgba
 from core.engine.renderers.geoutils import load_geojson
 
 product_dir = Path('data/processed/S2B_MSIL2A_20251025T132229_N0511_R038_T22KHB_20251025T151112')
@@ -50,7 +49,7 @@ ndvi_opts = IndexMapOptions(
 )
 index_renderer = IndexMapRenderer(ndvi_opts)
 index_data = index_renderer.prepare(index_path=ndvi_path, overlays=[aoi_path])
-rgba, _, _ = generate_rgba(index_data.data, ndvi_opts.cmap_name, ndvi_opts.vmin, ndvi_opts.vmax, ndvi_opts.opacity)
+rgba, _, _ = index_renderer.colorize(index_data)
 bounds = index_data.clip_bounds if index_data.clip_bounds is not None else index_data.bounds
 ndvi_layer = folium.FeatureGroup(name='NDVI', show=True)
 folium.raster_layers.ImageOverlay(
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import date, timedelta
 from pathlib import Path
@@ -8,11 +12,16 @@ from typing import Dict, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from core.domain import AreaOfInterest
 
 _LOGGER = logging.getLogger(__name__)
 _REQUEST_TIMEOUT = 60
+_DOWNLOAD_CHUNK_SIZE = 1 << 20
+_TOKEN_REFRESH_MARGIN = 60.0
+_QUERY_CACHE_TTL = 6 * 3600.0
 
 
 @dataclass
@@ -32,9 +41,15 @@ class CopernicusClient:
 
     def __init__(self, cfg: CopernicusConfig):
         self.cfg = cfg
+        self._token: Optional[str] = None
+        self._token_expiry = 0.0
+        self._query_cache: Dict[Tuple, Tuple[float, Optional[Dict]]] = {}
+
+    def _obtain_token(self) -> str:
+        """Retorna o bearer token, reutilizando o anterior enquanto válido."""
+        if self._token and time.time() < self._token_expiry - _TOKEN_REFRESH_MARGIN:
+            return self._token
 
-    def open_session(self) -> requests.Session:
-        """Abre uma sessão autenticada (token OAuth2 já aplicado)."""
         payload = {
             "grant_type": "password",
             "client_id": self.cfg.client_id,
@@ -44,12 +59,28 @@ class CopernicusClient:
         response = requests.post(self.cfg.token_url, data=payload, timeout=_REQUEST_TIMEOUT)
         response.raise_for_status()
 
-        token = response.json().get("access_token")
+        body = response.json()
+        token = body.get("access_token")
         if not token:
             raise RuntimeError("Failed to obtain access token from Copernicus Data Space.")
 
+        self._token = token
+        self._token_expiry = time.time() + float(body.get("expires_in", 600))
+        return token
+
+    def open_session(self) -> requests.Session:
+        """Abre uma sessão autenticada (token OAuth2 já aplicado)."""
+        token = self._obtain_token()
+
         session = requests.Session()
         session.headers.update({"Authorization": f"Bearer {token}"})
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504]),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
         return session
 
     def query_latest(
@@ -60,11 +91,23 @@ class CopernicusClient:
         end: date,
         cloud: Tuple[int, int] = (0, 30),
     ) -> Optional[Dict]:
-        """Consulta o produto Sentinel‑2 mais recente que atende aos filtros."""
+        """Consulta o produto Sentinel‑2 mais recente que atende aos filtros.
+
+        Resultados são memoizados por (AOI, período, nuvens) com TTL de 6 h,
+        evitando repetir a avaliação do intersect WKT no servidor em reruns.
+        """
         start_timestamp = f"{start.isoformat()}T00:00:00Z"
         end_timestamp = f"{(end + timedelta(days=1)).isoformat()}T00:00:00Z"
         footprint_wkt = aoi.to_wkt()
 
+        cache_key = (footprint_wkt, start.isoformat(), end.isoformat(), tuple(cloud))
+        cached = self._query_cache.get(cache_key)
+        if cached is not None:
+            cached_at, product = cached
+            if time.time() - cached_at < _QUERY_CACHE_TTL:
+                _LOGGER.debug("Reutilizando resultado OData em cache para %s", cache_key)
+                return product
+
         min_cloud, max_cloud = cloud
         cloud_filters: list[str] = []
         if min_cloud > 0:
@@ -106,9 +149,9 @@ class CopernicusClient:
 
         payload = response.json()
         products = payload.get("value", [])
-        if not products:
-            return None
-        return products[0]
+        product = products[0] if products else None
+        self._query_cache[cache_key] = (time.time(), product)
+        return product
 
     def download(self, session: requests.Session, product: Dict, dst_dir: Path) -> Path:
         """Baixa o produto (SAFE .zip) e retorna o caminho do arquivo."""
@@ -123,6 +166,10 @@ class CopernicusClient:
         download_url = urljoin(self.cfg.api_url.rstrip("/") + "/", f"Products({product_id})/$value")
 
         target_path = dst_dir / archive_name
+        # Redirects seguidos manualmente: o requests remove o header
+        # Authorization ao trocar de host (Session.rebuild_auth), e o
+        # endpoint $value redireciona para um host de download que exige
+        # o bearer token; re-emitir o GET pela sessão preserva o header.
         current_url = download_url
         for _ in range(5):
             response = session.get(
@@ -135,6 +182,7 @@ class CopernicusClient:
                 location = response.headers.get("Location")
                 if not location:
                     break
+                response.close()
                 current_url = urljoin(current_url, location)
                 continue
             break
@@ -145,10 +193,94 @@ class CopernicusClient:
             if response.status_code >= 400:
                 _LOGGER.error("Download request failed (%s): %s", response.status_code, response.text)
                 response.raise_for_status()
+            response.raw.decode_content = True
             with target_path.open("wb") as file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        file.write(chunk)
+                shutil.copyfileobj(response.raw, file, length=_DOWNLOAD_CHUNK_SIZE)
+        return target_path
+
+    def download_parallel(
+        self,
+        session: requests.Session,
+        product: Dict,
+        dst_dir: Path,
+        workers: int = 8,
+    ) -> Path:
+        """Baixa o produto com GETs paralelos via ``Range`` quando suportado.
+
+        Divide o arquivo em ``workers`` faixas de bytes baixadas em paralelo
+        na mesma sessão autenticada, escrevendo cada faixa diretamente no
+        offset correspondente do arquivo de destino. Caso o servidor não
+        anuncie suporte a ranges (ou o tamanho seja desconhecido), recai no
+        download sequencial de :meth:`download`.
+        """
+        dst_dir.mkdir(parents=True, exist_ok=True)
+
+        product_id = product.get("Id")
+        if not product_id:
+            raise RuntimeError("Product payload missing 'Id' field.")
+
+        product_name = product.get("Name") or str(product_id)
+        archive_name = product_name if product_name.endswith(".zip") else f"{product_name}.zip"
+        download_url = urljoin(self.cfg.api_url.rstrip("/") + "/", f"Products({product_id})/$value")
+
+        try:
+            head = session.head(download_url, allow_redirects=True, timeout=_REQUEST_TIMEOUT)
+            head.raise_for_status()
+        except requests.HTTPError:
+            # O redirect cross-host derruba o header Authorization no HEAD
+            # (Session.rebuild_auth); sem metadados confiáveis, recai no
+            # download sequencial, que segue os redirects manualmente.
+            _LOGGER.info("HEAD do produto falhou; usando download sequencial.")
+            return self.download(session, product, dst_dir)
+        final_url = head.url
+        total_size = int(head.headers.get("Content-Length") or 0)
+        accepts_ranges = head.headers.get("Accept-Ranges", "").lower() == "bytes"
+
+        if not accepts_ranges or total_size <= 0 or workers <= 1:
+            _LOGGER.info("Range requests indisponíveis; usando download sequencial.")
+            return self.download(session, product, dst_dir)
+
+        target_path = dst_dir / archive_name
+        span = -(-total_size // workers)
+        spans = [
+            (offset, min(offset + span, total_size) - 1)
+            for offset in range(0, total_size, span)
+        ]
+
+        fd = os.open(target_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        try:
+            os.truncate(fd, total_size)
+
+            def _fetch_span(start: int, end: int) -> None:
+                response = session.get(
+                    final_url,
+                    headers={"Range": f"bytes={start}-{end}"},
+                    stream=True,
+                    timeout=_REQUEST_TIMEOUT * 10,
+                )
+                with response:
+                    response.raise_for_status()
+                    offset = start
+                    for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                        if chunk:
+                            os.pwrite(fd, chunk, offset)
+                            offset += len(chunk)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_fetch_span, start, end) for start, end in spans]
+                for future in as_completed(futures):
+                    future.result()
+        except requests.HTTPError:
+            # Falha em um range-GET (ex.: URL pré-assinada expirada):
+            # descarta o parcial e recai no caminho sequencial.
+            _LOGGER.info("Range-GET falhou; usando download sequencial.")
+            os.close(fd)
+            fd = -1
+            target_path.unlink(missing_ok=True)
+            return self.download(session, product, dst_dir)
+        finally:
+            if fd >= 0:
+                os.close(fd)
         return target_path
 
     @staticmethod
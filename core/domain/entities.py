@@ -5,6 +5,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable
 
+import numpy as np
+
 
 @dataclass(frozen=True)
 class AreaOfInterest:
@@ -12,6 +14,9 @@ class AreaOfInterest:
 
     geometry: Dict
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_geom", self._extract_geometry(self.geometry))
+
     @classmethod
     def from_geojson(cls, geojson_path: Path) -> "AreaOfInterest":
         with Path(geojson_path).open("r", encoding="utf-8") as file:
@@ -19,28 +24,40 @@ class AreaOfInterest:
         return cls(geometry=geometry)
 
     def to_wkt(self) -> str:
-        """Converte a geometria armazenada em representação WKT (polígono)."""
-        geometry = self._extract_geometry(self.geometry)
+        """Converte a geometria armazenada em representação WKT (polígono).
+
+        O resultado é memoizado na instância (imutável), evitando reformatar
+        a geometria em consultas repetidas ao catálogo.
+        """
+        cached = self.__dict__.get("_wkt")
+        if cached is not None:
+            return cached
+
+        geometry: Dict = self._geom  # type: ignore[attr-defined]
         gtype = geometry.get("type")
         coordinates = geometry.get("coordinates")
 
         if gtype == "Polygon":
-            return self._polygon_to_wkt(coordinates)
-        if gtype == "MultiPolygon":
+            wkt = self._polygon_to_wkt(coordinates)
+        elif gtype == "MultiPolygon":
             polygon_wkts = [self._polygon_to_wkt(polygon) for polygon in coordinates]
             inner = ", ".join(wkt.replace("POLYGON ", "", 1) for wkt in polygon_wkts)
-            return f"MULTIPOLYGON ({inner})"
+            wkt = f"MULTIPOLYGON ({inner})"
+        else:
+            raise ValueError(f"Unsupported geometry type: {gtype}")
 
-        raise ValueError(f"Unsupported geometry type: {gtype}")
+        object.__setattr__(self, "_wkt", wkt)
+        return wkt
 
     @staticmethod
     def _extract_geometry(geometry: Dict) -> Dict:
-        if geometry.get("type") == "FeatureCollection":
+        gtype = geometry.get("type")
+        if gtype == "FeatureCollection":
             features = geometry.get("features", [])
             if not features:
                 raise ValueError("GeoJSON feature collection is empty.")
             return features[0]["geometry"]
-        if geometry.get("type") == "Feature":
+        if gtype == "Feature":
             return geometry["geometry"]
         return geometry
 
@@ -48,10 +65,13 @@ class AreaOfInterest:
     def _polygon_to_wkt(coordinates: Iterable[Iterable[Iterable[float]]]) -> str:
         rings = []
         for ring in coordinates:
-            if not ring:
+            if not len(ring):
                 raise ValueError("GeoJSON polygon ring is empty.")
-            if ring[0] != ring[-1]:
-                ring = list(ring) + [ring[0]]
-            rings.append(", ".join(f"{lon} {lat}" for lon, lat in ring))
+            # Formatação em lote via NumPy: evita um f-string por vértice.
+            arr = np.asarray(ring, dtype=np.float64)
+            if not np.array_equal(arr[0], arr[-1]):
+                arr = np.vstack([arr, arr[:1]])
+            pairs = np.char.add(np.char.add(arr[:, 0].astype(str), " "), arr[:, 1].astype(str))
+            rings.append(", ".join(pairs.tolist()))
         inner = ", ".join(f"({ring})" for ring in rings)
         return f"POLYGON ({inner})"
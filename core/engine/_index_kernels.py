@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+"""Kernels JIT (Numba) para os índices espectrais.
+
+Quando o Numba está instalado, os índices mais usados são computados por
+kernels ``@njit(parallel=True, fastmath=True)`` que percorrem os arrays em
+uma única passada fundida (sem temporários NumPy), com SIMD e paralelismo
+entre núcleos. Na ausência do Numba o módulo expõe ``NUMBA_AVAILABLE =
+False`` e o calculador usa o caminho NumPy vetorizado.
+"""
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - dependência opcional
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def normalized_difference_kernel(a, b, out):  # pragma: no cover - compilado
+        for i in prange(a.size):
+            d = a[i] + b[i]
+            out[i] = 0.0 if d == 0.0 else (a[i] - b[i]) / d
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def ratio_kernel(a, b, out):  # pragma: no cover - compilado
+        for i in prange(a.size):
+            d = b[i]
+            out[i] = 0.0 if d == 0.0 else a[i] / d
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def evi_kernel(nir, red, blue, out):  # pragma: no cover - compilado
+        for i in prange(nir.size):
+            d = nir[i] + 6.0 * red[i] - 7.5 * blue[i] + 1.0
+            out[i] = 0.0 if d == 0.0 else 2.5 * (nir[i] - red[i]) / d
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def sipi_kernel(nir, red, blue, out):  # pragma: no cover - compilado
+        for i in prange(nir.size):
+            d = nir[i] - red[i]
+            out[i] = 0.0 if d == 0.0 else (nir[i] - blue[i]) / d
@@ -2,11 +2,18 @@ from __future__ import annotations
 
 import csv
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Tuple
 
 import numpy as np
 from affine import Affine
-from rasterio.transform import xy
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    _PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - dependência opcional
+    _PYARROW_AVAILABLE = False
 
 
 class CSVExporter:
@@ -15,23 +22,75 @@ class CSVExporter:
     def __init__(self, *, fieldnames: Tuple[str, str, str] = ("longitude", "latitude", "value")) -> None:
         self.fieldnames = fieldnames
 
-    def export(self, data: np.ndarray, transform: Affine, output_path: Path) -> Path:
+    def export(
+        self,
+        data: np.ndarray,
+        transform: Affine,
+        output_path: Path,
+        *,
+        format: str = "csv",
+    ) -> Path:
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        mask = np.isfinite(data)
+        rows, cols = np.nonzero(mask)
+        lons, lats = self._coordinates(transform, rows, cols)
+        values = data[rows, cols].astype(np.float64, copy=False)
+
+        if format == "parquet":
+            return self._write_parquet(lons, lats, values, output_path)
+        if format != "csv":
+            raise ValueError(f"Formato de exportacao nao suportado: {format}")
+
+        if _PYARROW_AVAILABLE:
+            # Encoder nativo do Arrow: formata os milhões de linhas em C,
+            # sem o dispatch Python por linha do csv.writer.
+            table = pa.table(
+                {
+                    self.fieldnames[0]: lons,
+                    self.fieldnames[1]: lats,
+                    self.fieldnames[2]: values,
+                }
+            )
+            pacsv.write_csv(
+                table,
+                output_path,
+                write_options=pacsv.WriteOptions(include_header=True),
+            )
+            return output_path
+
         with output_path.open("w", newline="", encoding="utf-8") as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(self.fieldnames)
-            for row_idx, row in enumerate(data):
-                valid = np.isfinite(row)
-                if not np.any(valid):
-                    continue
-                cols = np.nonzero(valid)[0]
-                lons, lats = self._coordinates(transform, row_idx, cols)
-                for lon, lat, col_idx in zip(lons, lats, cols):
-                    writer.writerow([lon, lat, float(row[col_idx])])
+            writer.writerows(zip(lons.tolist(), lats.tolist(), values.tolist()))
+        return output_path
+
+    def _write_parquet(
+        self,
+        lons: np.ndarray,
+        lats: np.ndarray,
+        values: np.ndarray,
+        output_path: Path,
+    ) -> Path:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:  # pragma: no cover - dependência opcional
+            raise RuntimeError(
+                "Exportacao Parquet requer o pacote opcional 'pyarrow'."
+            ) from exc
+
+        table = pa.Table.from_arrays(
+            [pa.array(lons), pa.array(lats), pa.array(values)],
+            names=list(self.fieldnames),
+        )
+        pq.write_table(table, output_path, compression="zstd", compression_level=3, use_dictionary=False)
         return output_path
 
     @staticmethod
-    def _coordinates(transform: Affine, row: int, columns: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
-        rows_iter = [row] * len(columns)
-        lons, lats = xy(transform, rows_iter, list(columns), offset="center")
-        return np.asarray(lons), np.asarray(lats)
+    def _coordinates(transform: Affine, rows: np.ndarray, columns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Aplica a matriz affine a todos os pares (row, col) de uma vez."""
+        xs = columns.astype(np.float64, copy=False) + 0.5
+        ys = rows.astype(np.float64, copy=False) + 0.5
+        lons = transform.a * xs + transform.b * ys + transform.c
+        lats = transform.d * xs + transform.e * ys + transform.f
+        return lons, lats
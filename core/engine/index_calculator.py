@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable, Dict, Iterable, Optional, Tuple
@@ -7,43 +8,64 @@ from typing import Callable, Dict, Iterable, Optional, Tuple
 import numpy as np
 import rasterio
 from rasterio.enums import Resampling
-from rasterio.warp import reproject
+from rasterio.vrt import WarpedVRT
+
+from core.engine import _index_kernels
 
 
 def _compute_index(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
-    mask = denominator == 0
-    denominator = np.where(mask, np.nan, denominator)
-    index = numerator / denominator
-    return np.where(np.isnan(index), 0, index)
+    out = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def _normalized_difference(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if _index_kernels.NUMBA_AVAILABLE:
+        out = np.empty_like(a)
+        _index_kernels.normalized_difference_kernel(a.ravel(), b.ravel(), out.ravel())
+        return out
+    return _compute_index(a - b, a + b)
 
 
 def compute_ndvi(nir: np.ndarray, red: np.ndarray) -> np.ndarray:
-    return _compute_index(nir - red, nir + red)
+    return _normalized_difference(nir, red)
 
 
 def compute_ndwi(nir: np.ndarray, swir: np.ndarray) -> np.ndarray:
-    return _compute_index(nir - swir, nir + swir)
+    return _normalized_difference(nir, swir)
 
 
 def compute_msi(nir: np.ndarray, swir: np.ndarray) -> np.ndarray:
+    if _index_kernels.NUMBA_AVAILABLE:
+        out = np.empty_like(swir)
+        _index_kernels.ratio_kernel(swir.ravel(), nir.ravel(), out.ravel())
+        return out
     return _compute_index(swir, nir)
 
 
 def compute_evi(nir: np.ndarray, red: np.ndarray, blue: np.ndarray) -> np.ndarray:
-    denominator = nir + 6 * red - 7.5 * blue + 1
-    return 2.5 * _compute_index(nir - red, denominator)
+    if _index_kernels.NUMBA_AVAILABLE:
+        out = np.empty_like(nir)
+        _index_kernels.evi_kernel(nir.ravel(), red.ravel(), blue.ravel(), out.ravel())
+        return out
+    denominator = nir + 6 * red
+    denominator -= 7.5 * blue
+    denominator += 1
+    result = _compute_index(nir - red, denominator)
+    np.multiply(result, 2.5, out=result)
+    return result
 
 
 def compute_ndre(nir: np.ndarray, rededge: np.ndarray) -> np.ndarray:
-    return _compute_index(nir - rededge, nir + rededge)
+    return _normalized_difference(nir, rededge)
 
 
 def compute_ndmi(nir: np.ndarray, swir: np.ndarray) -> np.ndarray:
-    return _compute_index(nir - swir, nir + swir)
+    return _normalized_difference(nir, swir)
 
 
 def compute_ndre_generic(nir: np.ndarray, rededge: np.ndarray) -> np.ndarray:
-    return _compute_index(nir - rededge, nir + rededge)
+    return _normalized_difference(nir, rededge)
 
 
 def compute_ci_rededge(nir: np.ndarray, rededge4: np.ndarray) -> np.ndarray:
@@ -51,11 +73,15 @@ def compute_ci_rededge(nir: np.ndarray, rededge4: np.ndarray) -> np.ndarray:
 
 
 def compute_sipi(nir: np.ndarray, red: np.ndarray, blue: np.ndarray) -> np.ndarray:
+    if _index_kernels.NUMBA_AVAILABLE:
+        out = np.empty_like(nir)
+        _index_kernels.sipi_kernel(nir.ravel(), red.ravel(), blue.ravel(), out.ravel())
+        return out
     return _compute_index(nir - blue, nir - red)
 
 
 def compute_ndvire(nir: np.ndarray, rededge: np.ndarray) -> np.ndarray:
-    return _compute_index(nir - rededge, nir + rededge)
+    return _normalized_difference(nir, rededge)
 
 
 def compute_mcari2(nir: np.ndarray, red: np.ndarray, green: np.ndarray) -> np.ndarray:
@@ -66,38 +92,80 @@ def compute_mcari2(nir: np.ndarray, red: np.ndarray, green: np.ndarray) -> np.nd
     return np.where(np.isnan(denominator), 0.0, numerator / denominator)
 
 
-def load_raster(path: Path, reference_path: Optional[Path] = None) -> Tuple[np.ndarray, rasterio.Affine, rasterio.crs.CRS]:
-    with rasterio.open(path) as src:
-        data = src.read(1).astype(np.float32)
-        transform = src.transform
-        crs = src.crs
-        height = src.height
-        width = src.width
+def _apply_scale_offset(data: np.ndarray, src: rasterio.DatasetReader) -> np.ndarray:
+    """Converte valores crus para físicos usando as tags scale/offset do raster.
 
+    Saídas quantizadas do ``save_raster`` (int16 com scale 1e-4) dependem
+    disso: sem a conversão, os consumidores veriam valores ×10⁴.
+    """
+    scale = src.scales[0] if src.scales else 1.0
+    offset = src.offsets[0] if src.offsets else 0.0
+    if scale == 1.0 and offset == 0.0:
+        return data
+    if src.nodata is not None:
+        # O nodata é comparado no valor cru, antes de escalar.
+        data[data == np.float32(src.nodata)] = np.nan
+    data *= np.float32(scale)
+    data += np.float32(offset)
+    return data
+
+
+def load_raster(path: Path, reference_path: Optional[Path] = None) -> Tuple[np.ndarray, rasterio.Affine, rasterio.crs.CRS]:
     if reference_path is not None:
         with rasterio.open(reference_path) as ref:
-            if (transform != ref.transform) or (height != ref.height) or (width != ref.width):
-                destination = np.empty((ref.height, ref.width), dtype=np.float32)
-                reproject(
-                    source=data,
-                    destination=destination,
-                    src_transform=transform,
-                    src_crs=crs,
-                    dst_transform=ref.transform,
-                    dst_crs=ref.crs,
+            ref_transform = ref.transform
+            ref_crs = ref.crs
+            ref_height = ref.height
+            ref_width = ref.width
+
+        with rasterio.open(path) as src:
+            if (src.transform != ref_transform) or (src.height != ref_height) or (src.width != ref_width):
+                # WarpedVRT funde leitura + reprojeção em uma única chamada
+                # GDAL, sem materializar a banda na grade original.
+                data = np.empty((ref_height, ref_width), dtype=np.float32)
+                with WarpedVRT(
+                    src,
+                    crs=ref_crs,
+                    transform=ref_transform,
+                    width=ref_width,
+                    height=ref_height,
                     resampling=Resampling.bilinear,
-                )
-                data = destination
-                transform = ref.transform
-                crs = ref.crs
+                ) as vrt:
+                    vrt.read(1, out=data)
+                return _apply_scale_offset(data, src), ref_transform, ref_crs
 
-    return data, transform, crs
+            data = np.empty((src.height, src.width), dtype=np.float32)
+            src.read(1, out=data)
+            return _apply_scale_offset(data, src), src.transform, src.crs
 
+    with rasterio.open(path) as src:
+        data = np.empty((src.height, src.width), dtype=np.float32)
+        src.read(1, out=data)
+        return _apply_scale_offset(data, src), src.transform, src.crs
+
+
+_INT16_SCALE = 1e-4
+_INT16_NODATA = -32768
 
-def save_raster(array: np.ndarray, template_path: Path, destination: Path) -> Path:
+
+def save_raster(array: np.ndarray, template_path: Path, destination: Path, *, dtype: str = "float32") -> Path:
     destination.parent.mkdir(parents=True, exist_ok=True)
     with rasterio.open(template_path) as src:
         meta = src.meta.copy()
+
+    if dtype == "int16":
+        # Índices normalizados vivem em [-1, 1]; int16 com scale 1e-4 preserva
+        # 4 casas decimais e corta o arquivo pela metade.
+        finite = np.isfinite(array)
+        quantized = np.full(array.shape, _INT16_NODATA, dtype=np.int16)
+        quantized[finite] = np.clip(np.round(array[finite] / _INT16_SCALE), -32767, 32767).astype(np.int16)
+        meta.update(dtype="int16", count=1, nodata=_INT16_NODATA)
+        with rasterio.open(destination, "w", **meta) as dst:
+            dst.write(quantized, 1)
+            dst.scales = (_INT16_SCALE,)
+            dst.offsets = (0.0,)
+        return destination
+
     meta.update(dtype=rasterio.float32, count=1)
     with rasterio.open(destination, "w", **meta) as dst:
         dst.write(array.astype(rasterio.float32), 1)
@@ -131,8 +199,9 @@ INDEX_SPECS: Dict[str, IndexSpec] = {
 class IndexCalculator:
     """Compute spectral indices for a scene using configurable specs."""
 
-    def __init__(self, specs: Optional[Dict[str, IndexSpec]] = None):
+    def __init__(self, specs: Optional[Dict[str, IndexSpec]] = None, *, output_dtype: str = "float32"):
         self.specs = specs or INDEX_SPECS
+        self.output_dtype = output_dtype
 
     def analyse_scene(
         self,
@@ -159,14 +228,35 @@ class IndexCalculator:
         nir_data, transform, crs = load_raster(band_paths["nir"])
         band_arrays: Dict[str, np.ndarray] = {"nir": nir_data}
 
-        for band in required - {"nir"}:
-            data, _, _ = load_raster(band_paths[band], reference_path=band_paths["nir"])
-            band_arrays[band] = data
-
+        remaining = required - {"nir"}
+        if remaining:
+            # Leituras JP2/GTiff liberam o GIL dentro do GDAL; carregamos as
+            # bandas restantes em paralelo para sobrepor decode e I/O.
+            with ThreadPoolExecutor(max_workers=min(8, len(remaining))) as executor:
+                futures = {
+                    band: executor.submit(load_raster, band_paths[band], band_paths["nir"])
+                    for band in remaining
+                }
+                for band, future in futures.items():
+                    data, _, _ = future.result()
+                    band_arrays[band] = data
+
+        # A escrita GTiff (encode + disco) libera o GIL; gravamos os índices
+        # em paralelo enquanto os próximos são calculados.
         outputs: Dict[str, Path] = {}
-        for name in requested:
-            spec = self.specs[name]
-            arrays = [band_arrays[band] for band in spec.bands]
-            result = spec.func(*arrays)
-            outputs[name] = save_raster(result, band_paths["nir"], output_dir / f"{name}.tif")
+        with ThreadPoolExecutor(max_workers=min(4, len(requested))) as executor:
+            futures = {}
+            for name in requested:
+                spec = self.specs[name]
+                arrays = [band_arrays[band] for band in spec.bands]
+                result = spec.func(*arrays)
+                futures[name] = executor.submit(
+                    save_raster,
+                    result,
+                    band_paths["nir"],
+                    output_dir / f"{name}.tif",
+                    dtype=self.output_dtype,
+                )
+            for name, future in futures.items():
+                outputs[name] = future.result()
         return outputs
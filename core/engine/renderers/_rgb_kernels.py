@@ -0,0 +1,62 @@
+"""Kernels numba opcionais para o pipeline true color.
+
+Seguem o mesmo padrao de core.engine._index_kernels: quando o numba nao
+esta instalado, NUMBA_AVAILABLE fica False e o renderer usa o caminho
+NumPy equivalente.
+"""
+
+from __future__ import annotations
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - numba e dependencia opcional
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+
+    # fastmath sem 'nnan': os guardas r == r de NaN sao indefinidos sob
+    # nnan e podem ser dobrados para True, deixando passar pixels NaN.
+    _FASTMATH_FLAGS = {"contract", "arcp", "nsz"}
+
+    @njit(parallel=True, fastmath=_FASTMATH_FLAGS, cache=True)
+    def stretch_stack_kernel(red, green, blue, vmins, vmaxs, out):
+        """Stretch percentil das tres bandas direto no buffer (3, H, W)."""
+        height, width = red.shape
+        inv_r = 1.0 / (vmaxs[0] - vmins[0])
+        inv_g = 1.0 / (vmaxs[1] - vmins[1])
+        inv_b = 1.0 / (vmaxs[2] - vmins[2])
+        for i in prange(height):
+            for j in range(width):
+                r = (red[i, j] - vmins[0]) * inv_r
+                g = (green[i, j] - vmins[1]) * inv_g
+                b = (blue[i, j] - vmins[2]) * inv_b
+                out[0, i, j] = min(max(r, 0.0), 1.0) if r == r else 0.0
+                out[1, i, j] = min(max(g, 0.0), 1.0) if g == g else 0.0
+                out[2, i, j] = min(max(b, 0.0), 1.0) if b == b else 0.0
+
+    @njit(parallel=True, fastmath=_FASTMATH_FLAGS, cache=True)
+    def finalize_rgb_kernel(rgb, sat_boost, inv_gamma, out_u8):
+        """Saturacao + gamma + clip + quantizacao uint8 em um unico passe.
+
+        Le o buffer channels-first (3, H, W) e escreve o resultado ja no
+        layout (H, W, 3) esperado pelo encoder PNG.
+        """
+        height, width = rgb.shape[1], rgb.shape[2]
+        for i in prange(height):
+            for j in range(width):
+                r = rgb[0, i, j]
+                g = rgb[1, i, j]
+                b = rgb[2, i, j]
+                mean = (r + g + b) / 3.0
+                r = min(max(mean + (r - mean) * sat_boost, 0.0), 1.0)
+                g = min(max(mean + (g - mean) * sat_boost, 0.0), 1.0)
+                b = min(max(mean + (b - mean) * sat_boost, 0.0), 1.0)
+                if inv_gamma != 1.0:
+                    r = r ** inv_gamma
+                    g = g ** inv_gamma
+                    b = b ** inv_gamma
+                out_u8[i, j, 0] = int(r * 255.0)
+                out_u8[i, j, 1] = int(g * 255.0)
+                out_u8[i, j, 2] = int(b * 255.0)
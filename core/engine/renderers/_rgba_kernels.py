@@ -0,0 +1,49 @@
+"""Kernel numba opcional para a colorizacao RGBA de indices.
+
+Mesmo padrao de _rgb_kernels: sem numba instalado, NUMBA_AVAILABLE fica
+False e generate_rgba segue no pipeline matplotlib/NumPy.
+"""
+
+from __future__ import annotations
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - numba e dependencia opcional
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+
+    # fastmath sem 'nnan': o teste v == v de NaN e indefinido sob nnan e
+    # pode ser dobrado para True, tornando pixels nodata opacos.
+    _FASTMATH_FLAGS = {"contract", "arcp", "nsz"}
+
+    @njit(parallel=True, fastmath=_FASTMATH_FLAGS, cache=True)
+    def rgba_from_values(values, lut, vmin, vmax, opacity_u8, out):
+        """Normaliza + gather na LUT + alpha em um unico passe paralelo.
+
+        values: float32 (H, W); lut: uint8 (N, 4); out: uint8 (H, W, 4).
+        Pixels NaN saem totalmente transparentes (0, 0, 0, 0).
+        """
+        height, width = values.shape
+        top = lut.shape[0] - 1
+        scale = top / (vmax - vmin)
+        for i in prange(height):
+            for j in range(width):
+                v = values[i, j]
+                if v == v:
+                    idx = int((v - vmin) * scale)
+                    if idx < 0:
+                        idx = 0
+                    elif idx > top:
+                        idx = top
+                    out[i, j, 0] = lut[idx, 0]
+                    out[i, j, 1] = lut[idx, 1]
+                    out[i, j, 2] = lut[idx, 2]
+                    out[i, j, 3] = opacity_u8
+                else:
+                    out[i, j, 0] = 0
+                    out[i, j, 1] = 0
+                    out[i, j, 2] = 0
+                    out[i, j, 3] = 0
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import base64
 import io
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -13,6 +15,13 @@ from matplotlib.colors import Normalize
 from .geoutils import extract_geometry_bounds, iterate_geometries, load_geojson
 from .raster import load_raster
 
+try:
+    from PIL import Image, ImageDraw
+
+    _PIL_AVAILABLE = True
+except ImportError:  # pragma: no cover - dependência opcional
+    _PIL_AVAILABLE = False
+
 BAND_ORDER = [
     ("coastal", "B01 Coastal/Aerosol"),
     ("blue", "B02 Blue"),
@@ -42,6 +51,94 @@ class BandGalleryEntry:
     image_base64: str
 
 
+def _render_band_pil(
+    band_key: str,
+    band_label: str,
+    data: np.ndarray,
+    bounds: Tuple[float, float, float, float],
+    valid: np.ndarray,
+    vmin: float,
+    vmax: float,
+    geojson: Optional[Dict[str, Any]],
+) -> BandGalleryEntry:
+    """Gera o thumbnail via PIL, sem o custo de figura/axes do matplotlib."""
+    scaled = np.clip((data - vmin) / (vmax - vmin + 1e-12), 0.0, 1.0)
+    u8 = (scaled * 255).astype(np.uint8)
+    u8[~valid] = 0
+    u8 = np.flipud(u8)
+
+    image = Image.fromarray(u8, mode="L").convert("RGB")
+    if geojson:
+        min_lon, min_lat, max_lon, max_lat = bounds
+        lon_span = max(max_lon - min_lon, 1e-12)
+        lat_span = max(max_lat - min_lat, 1e-12)
+        width, height = image.size
+        draw = ImageDraw.Draw(image)
+        for geom in iterate_geometries(geojson):
+            points = [
+                (
+                    (coord[0] - min_lon) / lon_span * (width - 1),
+                    (coord[1] - min_lat) / lat_span * (height - 1),
+                )
+                for coord in geom["coordinates"][0]
+            ]
+            draw.line(points, fill=(0, 255, 255), width=1)
+
+    buf = io.BytesIO()
+    image.save(buf, format="PNG", optimize=False, compress_level=1)
+    encoded = base64.b64encode(buf.getvalue()).decode("utf-8")
+    return BandGalleryEntry(band_label, band_key, f"data:image/png;base64,{encoded}")
+
+
+def _render_band(
+    band_key: str,
+    band_label: str,
+    band_path: Path,
+    clip_bounds: Optional[Tuple[float, float, float, float]],
+    geojson: Optional[Dict[str, Any]],
+    stretch_percentiles: Tuple[float, float],
+) -> Optional[BandGalleryEntry]:
+    """Renderiza uma banda em PNG base64 (executável em subprocesso)."""
+    data, _, bounds = load_raster(band_path, clip_bounds_wgs84=clip_bounds)
+
+    valid = np.isfinite(data)
+    finite = data[valid]
+    if finite.size == 0:
+        return None
+
+    # np.quantile sobre os valores já filtrados usa seleção parcial (O(N)),
+    # evitando o sort + re-varredura de NaNs do np.nanpercentile.
+    quantiles = np.asarray(stretch_percentiles, dtype=np.float64) / 100.0
+    vmin, vmax = np.quantile(finite, quantiles)
+
+    if _PIL_AVAILABLE:
+        return _render_band_pil(band_key, band_label, data, bounds, valid, float(vmin), float(vmax), geojson)
+    norm = Normalize(vmin=vmin, vmax=vmax, clip=True)
+
+    fig, ax = plt.subplots(figsize=(4, 4))
+    min_lon, min_lat, max_lon, max_lat = bounds
+    ax.imshow(norm(data), cmap="gray", extent=[min_lon, max_lon, min_lat, max_lat], origin="lower")
+    ax.set_xlim(min_lon, max_lon)
+    ax.set_ylim(min_lat, max_lat)
+    ax.set_aspect("equal", adjustable="box")
+
+    if geojson:
+        for geom in iterate_geometries(geojson):
+            xs = [coord[0] for coord in geom["coordinates"][0]]
+            ys = [coord[1] for coord in geom["coordinates"][0]]
+            ax.plot(xs, ys, color="cyan", linewidth=1)
+
+    ax.set_title(f"{band_label}\n({band_key}.tif)\n[{vmin:.2f}, {vmax:.2f}]")
+    ax.axis("off")
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight", dpi=150)
+    plt.close(fig)
+    buf.seek(0)
+    encoded = base64.b64encode(buf.read()).decode("utf-8")
+    return BandGalleryEntry(band_label, band_key, f"data:image/png;base64,{encoded}")
+
+
 class BandGalleryRenderer:
     """Object-oriented renderer for the Sentinel-2 band gallery."""
 
@@ -57,61 +154,37 @@ class BandGalleryRenderer:
         geojson = load_geojson(geojson_path) if geojson_path else None
         clip_bounds = extract_geometry_bounds(geojson) if geojson else None
 
+        tasks = [
+            (band_key, band_label, product_dir / f"{band_key}.tif")
+            for band_key, band_label in BAND_ORDER
+            if (product_dir / f"{band_key}.tif").exists()
+        ]
+
         entries: List[BandGalleryEntry] = []
-        extent: Optional[Tuple[float, float, float, float]] = None
-
-        for band_key, band_label in BAND_ORDER:
-            band_path = product_dir / f"{band_key}.tif"
-            if not band_path.exists():
-                continue
-
-            data, _, bounds = load_raster(band_path, clip_bounds_wgs84=clip_bounds)
-            if extent is None:
-                extent = bounds
-
-            valid = np.isfinite(data)
-            if not np.any(valid):
-                continue
-
-            vmin, vmax = np.nanpercentile(data[valid], self.options.stretch_percentiles)
-            norm = Normalize(vmin=vmin, vmax=vmax, clip=True)
-
-            fig, ax = plt.subplots(figsize=(4, 4))
-            if extent is not None:
-                min_lon, min_lat, max_lon, max_lat = extent
-                ax.imshow(norm(data), cmap="gray", extent=[min_lon, max_lon, min_lat, max_lat], origin="lower")
-                ax.set_xlim(min_lon, max_lon)
-                ax.set_ylim(min_lat, max_lat)
-                ax.set_aspect("equal", adjustable="box")
-            else:
-                ax.imshow(norm(data), cmap="gray")
-
-            if geojson:
-                for geom in iterate_geometries(geojson):
-                    xs = [coord[0] for coord in geom["coordinates"][0]]
-                    ys = [coord[1] for coord in geom["coordinates"][0]]
-                    ax.plot(xs, ys, color="cyan", linewidth=1)
-
-            ax.set_title(f"{band_label}\n({band_key}.tif)\n[{vmin:.2f}, {vmax:.2f}]")
-            ax.axis("off")
-
-            image_b64 = self._figure_to_base64(fig)
-            entries.append(BandGalleryEntry(band_label, band_key, image_b64))
+        if tasks:
+            # Figuras matplotlib não são thread-safe; usamos subprocessos para
+            # paralelizar rasterização + encode PNG banda a banda.
+            max_workers = min(len(tasks), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        _render_band,
+                        band_key,
+                        band_label,
+                        band_path,
+                        clip_bounds,
+                        geojson,
+                        self.options.stretch_percentiles,
+                    )
+                    for band_key, band_label, band_path in tasks
+                ]
+                entries = [entry for future in futures for entry in [future.result()] if entry is not None]
 
         html = self._build_html(product_dir.name, entries, geojson_path)
         output_html.parent.mkdir(parents=True, exist_ok=True)
         output_html.write_text(html, encoding="utf-8")
         return output_html
 
-    @staticmethod
-    def _figure_to_base64(fig: plt.Figure) -> str:
-        buf = io.BytesIO()
-        fig.savefig(buf, format="png", bbox_inches="tight", dpi=150)
-        plt.close(fig)
-        buf.seek(0)
-        encoded = base64.b64encode(buf.read()).decode("utf-8")
-        return f"data:image/png;base64,{encoded}"
-
     @staticmethod
     def _build_html(
         product_name: str,
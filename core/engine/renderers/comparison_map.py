@@ -1,22 +1,49 @@
 from __future__ import annotations
 
+import base64
+import io
+import json
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, Optional, Sequence
 
 import folium
-import numpy as np
-from branca.colormap import LinearColormap
 from folium.plugins import DualMap
-from matplotlib import colormaps, colors
+from matplotlib import cm, colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
 
+from .folium_utils import CachedImageOverlay, aoi_style
 from .geoutils import load_geojson
 from .index_map import IndexMapOptions, IndexMapRenderer
 from .options import BaseMapOptions
 from .raster import generate_rgba
 
 
-@dataclass
+@lru_cache(maxsize=16)
+def _colorbar_data_uri(cmap_name: str, vmin: float, vmax: float, caption: str) -> str:
+    """Barra de cores estática como data-URI PNG, memoizada por (cmap, faixa).
+
+    Substitui o LinearColormap do branca, cuja expansão de template por
+    render aparece como ponto quente nos painéis multi-data; a mesma faixa
+    de valores é renderizada uma única vez por processo.
+    """
+    fig = Figure(figsize=(3.6, 0.8), dpi=96)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0.05, 0.45, 0.9, 0.28])
+    mappable = cm.ScalarMappable(norm=Normalize(vmin=vmin, vmax=vmax), cmap=colormaps[cmap_name])
+    fig.colorbar(mappable, cax=ax, orientation="horizontal")
+    ax.tick_params(labelsize=7)
+    ax.set_title(caption, fontsize=8)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return f"data:image/png;base64,{encoded}"
+
+
+@dataclass(slots=True, frozen=True)
 class ComparisonMapOptions(BaseMapOptions):
     colormap: str = "RdYlGn"
     opacity: float = 0.75
@@ -61,6 +88,8 @@ class ComparisonMapRenderer:
         centre_lat = (min_lat + max_lat) / 2
         centre_lon = (min_lon + max_lon) / 2
 
+        index_label = index_path.stem.upper()
+
         image, min_value, max_value = generate_rgba(
             data=prepared.data,
             cmap_name=self.options.colormap,
@@ -79,25 +108,32 @@ class ComparisonMapRenderer:
         self._add_basemap(dual_map.m1)
         self._add_basemap(dual_map.m2)
 
-        folium.raster_layers.ImageOverlay(
+        CachedImageOverlay(
             image=image,
             bounds=[[min_lat, min_lon], [max_lat, max_lon]],
             opacity=1.0,
-            name=index_path.stem.upper(),
+            name=index_label,
         ).add_to(dual_map.m2)
 
         overlay_geojsons = [load_geojson(path) for path in overlay_paths]
         for data_geo in overlay_geojsons:
-            folium.GeoJson(data=data_geo, name="AOI", style_function=lambda _: {"fillOpacity": 0}).add_to(dual_map.m1)
-            folium.GeoJson(data=data_geo, name="AOI", style_function=lambda _: {"fillOpacity": 0}).add_to(dual_map.m2)
-
-        colorbar = LinearColormap(
-            [colors.rgb2hex(colormaps[self.options.colormap](x)) for x in np.linspace(0, 1, 10)],
-            vmin=min_value,
-            vmax=max_value,
+            # Serializa o GeoJSON uma única vez: o folium aceita a string
+            # pronta e pula o json.dumps interno, que seria pago duas vezes
+            # (um por subpainel) em AOIs grandes.
+            geo_str = json.dumps(data_geo, separators=(",", ":"))
+            folium.GeoJson(data=geo_str, name="AOI", style_function=aoi_style).add_to(dual_map.m1)
+            folium.GeoJson(data=geo_str, name="AOI", style_function=aoi_style).add_to(dual_map.m2)
+
+        caption = f"{index_label} (min={min_value:.3f}, max={max_value:.3f})"
+        legend_uri = _colorbar_data_uri(
+            self.options.colormap, round(min_value, 6), round(max_value, 6), caption
+        )
+        legend_html = (
+            '<div style="position: fixed; bottom: 24px; right: 24px; z-index: 9999; '
+            'background: rgba(255,255,255,0.85); padding: 2px; border-radius: 4px;">'
+            f'<img src="{legend_uri}" alt="{caption}"></div>'
         )
-        colorbar.caption = f"{index_path.stem.upper()} (min={min_value:.3f}, max={max_value:.3f})"
-        colorbar.add_to(dual_map.m2)
+        dual_map.m2.get_root().html.add_child(folium.Element(legend_html))
 
         dual_map.fit_bounds([[min_lat, min_lon], [max_lat, max_lon]])
         folium.LayerControl(position="topright").add_to(dual_map.m1)
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
-import tempfile
-from dataclasses import dataclass
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple, dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence
+from string import Template
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from weakref import WeakValueDictionary
 
 from .csv_map import CSVMapOptions, CSVMapRenderer
+from .csv_utils import list_csv_files
 from .index_map import IndexMapData, IndexMapOptions, IndexMapRenderer
 from .options import BaseMapOptions
 from .truecolor_map import TrueColorOptions, TrueColorRenderer
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CSVDashboardOptions(BaseMapOptions):
     colormap: str = "RdYlGn"
     opacity: float = 0.75
@@ -21,11 +26,97 @@ class CSVDashboardOptions(BaseMapOptions):
     stretch_upper: float = 98.0
 
 
+# Cache fraco de TrueColorData por (bandas RGB + mtimes, overlays, opções):
+# re-renderizações do dashboard com os mesmos rasters pulam o prepare inteiro.
+# WeakValueDictionary deixa o GC descartar entradas quando ninguém mais as usa.
+_TRUECOLOR_CACHE: "WeakValueDictionary[Tuple, object]" = WeakValueDictionary()
+
+
+def _truecolor_cache_key(
+    red_path: Path,
+    green_path: Path,
+    blue_path: Path,
+    overlay_paths: Sequence[Path],
+    options: CSVDashboardOptions,
+) -> Tuple:
+    return (
+        str(red_path),
+        os.path.getmtime(red_path),
+        str(green_path),
+        os.path.getmtime(green_path),
+        str(blue_path),
+        os.path.getmtime(blue_path),
+        tuple(str(path) for path in overlay_paths),
+        astuple(options),
+    )
+
+
+def _build_csv_renderer(options: CSVDashboardOptions) -> CSVMapRenderer:
+    return CSVMapRenderer(
+        CSVMapOptions(
+            colormap=options.colormap,
+            vmin=options.vmin,
+            vmax=options.vmax,
+            opacity=options.opacity,
+            tiles=options.tiles,
+            tile_attr=options.tile_attr,
+            padding_factor=options.padding_factor,
+            clip=options.clip,
+            upsample=options.upsample,
+            sharpen=options.sharpen,
+            sharpen_radius=options.sharpen_radius,
+            sharpen_amount=options.sharpen_amount,
+            smooth_radius=options.smooth_radius,
+            zoom_start=options.zoom_start,
+            min_zoom=options.min_zoom,
+            max_zoom=options.max_zoom,
+            max_native_zoom=options.max_native_zoom,
+        )
+    )
+
+
+def _build_index_renderer(options: CSVDashboardOptions) -> IndexMapRenderer:
+    return IndexMapRenderer(
+        IndexMapOptions(
+            cmap_name=options.colormap,
+            vmin=options.vmin,
+            vmax=options.vmax,
+            opacity=options.opacity,
+            tiles=options.tiles,
+            tile_attr=options.tile_attr,
+            padding_factor=options.padding_factor,
+            clip=options.clip,
+            upsample=options.upsample,
+            smooth_radius=options.smooth_radius,
+            sharpen=options.sharpen,
+            sharpen_radius=options.sharpen_radius,
+            sharpen_amount=options.sharpen_amount,
+            zoom_start=options.zoom_start,
+            min_zoom=options.min_zoom,
+            max_zoom=options.max_zoom,
+            max_native_zoom=options.max_native_zoom,
+        )
+    )
+
+
+def _render_one_csv(
+    csv_path: Path,
+    overlay_paths: Sequence[Path],
+    options: CSVDashboardOptions,
+) -> Tuple[str, str]:
+    """Prepara e renderiza um CSV em HTML (executável em subprocesso)."""
+    csv_renderer = _build_csv_renderer(options)
+    index_renderer = _build_index_renderer(options)
+    prepared = csv_renderer.prepare(csv_path=csv_path, overlays=list(overlay_paths))
+    return prepared.index_name, index_renderer.render_html_string(prepared)
+
+
 class CSVDashboardRenderer:
     """Object-oriented renderer that composes true color and CSV layers into a tabbed dashboard."""
 
     def __init__(self, options: Optional[CSVDashboardOptions] = None):
         self.options = options or CSVDashboardOptions()
+        self._last_truecolor = None
 
     def render(
         self,
@@ -37,12 +128,14 @@ class CSVDashboardRenderer:
         overlays: Iterable[Path],
         output_path: Path,
     ) -> Path:
-        csv_files = sorted(csv_dir.glob("*.csv"))
+        csv_files = list_csv_files(csv_dir)
         if not csv_files:
             raise ValueError(f"Nenhum CSV encontrado em {csv_dir}")
 
         overlay_paths = list(overlays)
-        layer_html_map: Dict[str, str] = {}
+        # Hash pré-dimensionado com as chaves na ordem final das abas;
+        # as atribuições abaixo só preenchem os valores.
+        layer_html_map: Dict[str, str] = dict.fromkeys(["truecolor"] + [path.stem for path in csv_files])
 
         truecolor_renderer = TrueColorRenderer(
             TrueColorOptions(
@@ -61,135 +154,109 @@ class CSVDashboardRenderer:
                 max_native_zoom=self.options.max_native_zoom,
             )
         )
-        truecolor_data = truecolor_renderer.prepare(
-            red_path=red_path,
-            green_path=green_path,
-            blue_path=blue_path,
-            overlays=overlay_paths,
-        )
-        layer_html_map["truecolor"] = self._render_map_to_iframe(
-            lambda tmp_path: truecolor_renderer.render_html(truecolor_data, tmp_path)
-        )
-
-        csv_renderer = CSVMapRenderer(
-            CSVMapOptions(
-                colormap=self.options.colormap,
-                vmin=self.options.vmin,
-                vmax=self.options.vmax,
-                opacity=self.options.opacity,
-                tiles=self.options.tiles,
-                tile_attr=self.options.tile_attr,
-                padding_factor=self.options.padding_factor,
-                clip=self.options.clip,
-                upsample=self.options.upsample,
-                sharpen=self.options.sharpen,
-                sharpen_radius=self.options.sharpen_radius,
-                sharpen_amount=self.options.sharpen_amount,
-                smooth_radius=self.options.smooth_radius,
-                zoom_start=self.options.zoom_start,
-                min_zoom=self.options.min_zoom,
-                max_zoom=self.options.max_zoom,
-                max_native_zoom=self.options.max_native_zoom,
-            )
-        )
-        index_renderer = IndexMapRenderer(
-            IndexMapOptions(
-                cmap_name=self.options.colormap,
-                vmin=self.options.vmin,
-                vmax=self.options.vmax,
-                opacity=self.options.opacity,
-                tiles=self.options.tiles,
-                tile_attr=self.options.tile_attr,
-                padding_factor=self.options.padding_factor,
-                clip=self.options.clip,
-                upsample=self.options.upsample,
-                smooth_radius=self.options.smooth_radius,
-                sharpen=self.options.sharpen,
-                sharpen_radius=self.options.sharpen_radius,
-                sharpen_amount=self.options.sharpen_amount,
-                zoom_start=self.options.zoom_start,
-                min_zoom=self.options.min_zoom,
-                max_zoom=self.options.max_zoom,
-                max_native_zoom=self.options.max_native_zoom,
+        cache_key = _truecolor_cache_key(red_path, green_path, blue_path, overlay_paths, self.options)
+        truecolor_data = _TRUECOLOR_CACHE.get(cache_key)
+        if truecolor_data is None:
+            truecolor_data = truecolor_renderer.prepare(
+                red_path=red_path,
+                green_path=green_path,
+                blue_path=blue_path,
+                overlays=overlay_paths,
             )
-        )
+            _TRUECOLOR_CACHE[cache_key] = truecolor_data
+        # A referência no renderer mantém a entrada viva entre renders
+        # sucessivos (o WeakValueDictionary sozinho não segura o valor).
+        self._last_truecolor = truecolor_data
+        layer_html_map["truecolor"] = truecolor_renderer.render_html_string(truecolor_data)
 
-        for csv_path in csv_files:
-            prepared = csv_renderer.prepare(csv_path=csv_path, overlays=overlay_paths)
-            layer_html_map[prepared.index_name] = self._render_map_to_iframe(
-                lambda tmp_path, prepared=prepared: index_renderer.render_html(prepared, tmp_path)
-            )
+        # Cada CSV envolve IO de raster, suavização e serialização HTML
+        # independentes; subprocessos paralelizam o trabalho entre núcleos.
+        max_workers = min(len(csv_files), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_render_one_csv, csv_path, overlay_paths, self.options)
+                for csv_path in csv_files
+            ]
+            for future in futures:
+                index_name, html = future.result()
+                layer_html_map[index_name] = html
 
         dashboard_html = self._build_dashboard_html(layer_html_map)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         output_path.write_text(dashboard_html, encoding="utf-8")
         return output_path
 
-    @staticmethod
-    def _render_map_to_iframe(writer) -> str:
-        with tempfile.NamedTemporaryFile(suffix=".html", delete=False) as tmp_file:
-            tmp_path = Path(tmp_file.name)
-        try:
-            writer(tmp_path)
-            html = tmp_path.read_text(encoding="utf-8")
-        finally:
-            tmp_path.unlink(missing_ok=True)
-        return html
-
     @staticmethod
     def _build_dashboard_html(layer_html_map: Dict[str, str], width: str = "100%", height: str = "600px") -> str:
-        tabs_html = "".join(f"<li><a href='#{key}'>{key}</a></li>" for key in layer_html_map.keys())
-        content_html = "".join(f"<div id='{key}' class='tab-content'>{html}</div>" for key, html in layer_html_map.items())
-        return f"""
+        # Um único percurso do dict alimentando dois buffers incrementais,
+        # em vez de dois joins que materializam strings intermediárias.
+        tabs = io.StringIO()
+        contents = io.StringIO()
+        for key, html in layer_html_map.items():
+            tabs.write(f"<li><a href='#{key}'>{key}</a></li>")
+            contents.write(f"<div id='{key}' class='tab-content'>{html}</div>")
+        return _DASHBOARD_TEMPLATE.substitute(
+            width=width,
+            height=height,
+            tabs_html=tabs.getvalue(),
+            content_html=contents.getvalue(),
+        )
+
+
+# Esqueleto estático do dashboard, preparado uma única vez no import;
+# cada render só substitui os quatro campos dinâmicos.
+_DASHBOARD_TEMPLATE = Template(
+    """
 <!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="utf-8" />
     <title>Dashboard Indices Sentinel-2</title>
     <style>
-        body {{ font-family: Arial, sans-serif; margin: 0; padding: 0; }}
-        .tabs {{ list-style: none; margin: 0; padding: 0; display: flex; background: #2b3d4f; }}
-        .tabs li {{ flex: 1; }}
-        .tabs a {{
+        body { font-family: Arial, sans-serif; margin: 0; padding: 0; }
+        .tabs { list-style: none; margin: 0; padding: 0; display: flex; background: #2b3d4f; }
+        .tabs li { flex: 1; }
+        .tabs a {
             display: block;
             padding: 12px;
             color: #fff;
             text-align: center;
             text-decoration: none;
             transition: background 0.2s;
-        }}
-        .tabs a.active, .tabs a:hover {{ background: #1a252f; }}
-        .tab-content {{ display: none; width: {width}; height: {height}; }}
-        .tab-content.active {{ display: block; }}
-        iframe {{ border: none; width: 100%; height: 100%; }}
+        }
+        .tabs a.active, .tabs a:hover { background: #1a252f; }
+        .tab-content { display: none; width: ${width}; height: ${height}; }
+        .tab-content.active { display: block; }
+        iframe { border: none; width: 100%; height: 100%; }
     </style>
 </head>
 <body>
     <ul class="tabs">
-        {tabs_html}
+        ${tabs_html}
     </ul>
-    {content_html}
+    ${content_html}
     <script>
         const tabs = document.querySelectorAll('.tabs a');
         const contents = document.querySelectorAll('.tab-content');
-        function activateTab(targetId) {{
+        function activateTab(targetId) {
             contents.forEach(content => content.classList.remove('active'));
             tabs.forEach(tab => tab.classList.remove('active'));
             document.getElementById(targetId).classList.add('active');
-            document.querySelector(`.tabs a[href='#${{targetId}}']`).classList.add('active');
-        }}
-        tabs.forEach(tab => {{
-            tab.addEventListener('click', event => {{
+            document.querySelector(`.tabs a[href='#$${targetId}']`).classList.add('active');
+        }
+        tabs.forEach(tab => {
+            tab.addEventListener('click', event => {
                 event.preventDefault();
                 const targetId = tab.getAttribute('href').substring(1);
                 activateTab(targetId);
-            }});
-        }});
-        if (tabs.length > 0) {{
+            });
+        });
+        if (tabs.length > 0) {
             const firstId = tabs[0].getAttribute('href').substring(1);
             activateTab(firstId);
-        }}
+        }
     </script>
 </body>
 </html>
 """.strip()
+)
@@ -1,26 +1,55 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from weakref import WeakValueDictionary
 
 import folium
 import numpy as np
 from branca.colormap import LinearColormap
 
 from .csv_utils import build_grid, expand_to_clip_bounds, load_csv_grid
-from .geoutils import extract_geometry_bounds, load_geojson
+from .geoutils import load_geojson, load_geojson_bounds
 from .index_map import IndexMapData, IndexMapOptions, IndexMapRenderer
-from .raster import apply_smoothing, apply_unsharp_mask, upsample_raster
+from .raster import apply_unsharp_mask, polyphase_upsample
 from .options import BaseMapOptions
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CSVMapOptions(BaseMapOptions):
     colormap: str = "RdYlGn"
     vmin: Optional[float] = None
     vmax: Optional[float] = None
     opacity: float = 0.75
+    # dtype de trabalho da grade; float32 e o padrao (metade da banda de
+    # memoria do float64 nos filtros e colormap).
+    dtype: str = "float32"
+
+
+# Cache fraco do prepare() por (CSV + mtime, overlays, opções): painel,
+# dashboard e export de CSV sobre o mesmo arquivo reutilizam a mesma grade
+# preparada em vez de refazer decode + filtros + upsample. Segue o padrão
+# do _TRUECOLOR_CACHE do csv_dashboard.
+_PREPARED_CACHE: "WeakValueDictionary[Tuple, IndexMapData]" = WeakValueDictionary()
+
+
+def _prepared_cache_key(
+    csv_path: Path,
+    overlay_paths: Sequence[Path],
+    options: CSVMapOptions,
+) -> Tuple:
+    # As opções inteiras (frozen, hasheáveis) entram na chave — inclusive
+    # colormap/opacity: o IndexMapData memoiza a imagem colorizada
+    # (colorize), então entradas com estilos distintos não podem
+    # compartilhar o mesmo objeto preparado.
+    return (
+        str(csv_path),
+        os.path.getmtime(csv_path),
+        tuple((str(path), os.path.getmtime(path)) for path in overlay_paths),
+        options,
+    )
 
 
 class CSVMapRenderer:
@@ -28,20 +57,27 @@ class CSVMapRenderer:
 
     def __init__(self, options: Optional[CSVMapOptions] = None):
         self.options = options or CSVMapOptions()
+        self._last_prepared: Optional[IndexMapData] = None
 
     def prepare(
         self,
         csv_path: Path,
         overlays: Optional[Iterable[Path]] = None,
     ) -> IndexMapData:
+        overlay_paths = list(overlays or [])
+        cache_key = _prepared_cache_key(csv_path, overlay_paths, self.options)
+        cached = _PREPARED_CACHE.get(cache_key)
+        if cached is not None:
+            self._last_prepared = cached
+            return cached
+
         lons, lats, values = load_csv_grid(csv_path)
         grid, transform = build_grid(lons, lats, values)
 
-        overlays = overlays or []
-        overlay_geojsons = [load_geojson(path) for path in overlays]
-        clip_bounds = self._compute_clip_bounds(overlay_geojsons) if self.options.clip else None
+        overlay_geojsons = [load_geojson(path) for path in overlay_paths]
+        clip_bounds = self._compute_clip_bounds(overlay_paths) if self.options.clip else None
 
-        data = grid
+        data = grid.astype(self.options.dtype, copy=False)
         if self.options.sharpen:
             data = apply_unsharp_mask(data, self.options.sharpen_radius, self.options.sharpen_amount)
 
@@ -51,15 +87,16 @@ class CSVMapRenderer:
         if clip_bounds is not None and self.options.clip:
             data, transform = expand_to_clip_bounds(data, transform, clip_bounds)
 
-        data, transform = upsample_raster(data, transform, self.options.upsample)
-        data = apply_smoothing(data, self.options.smooth_radius)
+        # Upsample + suavização fundidos: nunca materializa o intermediário
+        # fator^2 maior entre os dois passes.
+        data, transform = polyphase_upsample(data, transform, self.options.upsample, self.options.smooth_radius)
 
         if overlay_geojsons and self.options.clip and self.options.upsample > 1.0:
             data = IndexMapRenderer._mask_with_geojson(data, transform, overlay_geojsons)  # type: ignore[attr-defined]
 
         bounds = self._array_bounds(data, transform)
 
-        return IndexMapData(
+        prepared = IndexMapData(
             data=data,
             transform=transform,
             bounds=bounds,
@@ -67,6 +104,11 @@ class CSVMapRenderer:
             overlays=overlay_geojsons,
             index_name=csv_path.stem,
         )
+        _PREPARED_CACHE[cache_key] = prepared
+        # Referência forte no renderer: o WeakValueDictionary sozinho não
+        # segura a entrada depois que o chamador descarta o retorno.
+        self._last_prepared = prepared
+        return prepared
 
     def render_html(self, prepared: IndexMapData, output_path: Path) -> Path:
         common_kwargs = dict(
@@ -98,16 +140,15 @@ class CSVMapRenderer:
 
     def _compute_clip_bounds(
         self,
-        overlay_geojsons: Sequence[Dict],
+        overlay_paths: Sequence[Path],
     ) -> Optional[Tuple[float, float, float, float]]:
-        geom_bounds = [extract_geometry_bounds(data) for data in overlay_geojsons]
+        geom_bounds = [load_geojson_bounds(path) for path in overlay_paths]
         geom_bounds = [bounds for bounds in geom_bounds if bounds is not None]
         if not geom_bounds:
             return None
-        min_lon_geo = min(b[0] for b in geom_bounds)
-        min_lat_geo = min(b[1] for b in geom_bounds)
-        max_lon_geo = max(b[2] for b in geom_bounds)
-        max_lat_geo = max(b[3] for b in geom_bounds)
+        bounds_arr = np.asarray(geom_bounds, dtype=np.float64)
+        min_lon_geo, min_lat_geo = bounds_arr[:, 0].min(), bounds_arr[:, 1].min()
+        max_lon_geo, max_lat_geo = bounds_arr[:, 2].max(), bounds_arr[:, 3].max()
         width_geo = max_lon_geo - min_lon_geo
         height_geo = max_lat_geo - min_lat_geo
         pad_lon = width_geo * self.options.padding_factor / 2
@@ -1,16 +1,74 @@
 from __future__ import annotations
 
 import csv
+import os
 from pathlib import Path
-from typing import Tuple
+from typing import Iterable, List, Optional, Tuple
 
 import numpy as np
 from affine import Affine
 from rasterio.transform import array_bounds
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    _PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - pyarrow e dependencia opcional
+    _PYARROW_AVAILABLE = False
+
+
+def list_csv_files(csv_dir: Path, stems: Optional[Iterable[str]] = None) -> List[Path]:
+    """Lista os CSVs de um diretório via os.scandir, ordenados por nome.
+
+    Path.glob embrulha cada entrada em um Path com stats extras; aqui os
+    filtros de sufixo (e de stems, quando informado) rodam sobre os nomes
+    crus do scandir e só as entradas selecionadas viram Path.
+    """
+    wanted = set(stems) if stems else None
+    with os.scandir(csv_dir) as entries:
+        names = [
+            entry.name
+            for entry in entries
+            if entry.name.endswith(".csv")
+            and (wanted is None or entry.name[:-4] in wanted)
+            and entry.is_file()
+        ]
+    return [csv_dir / name for name in sorted(names)]
+
 
 def load_csv_grid(path: Path) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Read CSV exported from the pipeline and return lon/lat/value arrays."""
+    """Read CSV exported from the pipeline and return lon/lat/value arrays.
+
+    Com pyarrow o parse roda no leitor C multi-thread e as tres colunas
+    saem como buffers numpy contiguos (SoA), sem objeto Python por linha;
+    o fallback mantem o leitor da stdlib.
+    """
+    if _PYARROW_AVAILABLE:
+        try:
+            table = pacsv.read_csv(
+                str(path),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=["longitude", "latitude", "value"],
+                    column_types={
+                        "longitude": pa.float64(),
+                        "latitude": pa.float64(),
+                        "value": pa.float32(),
+                    },
+                ),
+            )
+        except pa.ArrowInvalid as exc:
+            raise ValueError(f"CSV {path} possui valores invalidos: {exc}") from exc
+        except pa.ArrowKeyError as exc:
+            raise ValueError(f"CSV {path} precisa das colunas longitude, latitude, value.") from exc
+        if table.num_rows == 0:
+            raise ValueError(f"CSV {path} esta vazio ou sem dados validos.")
+        return (
+            table["longitude"].to_numpy(zero_copy_only=False),
+            table["latitude"].to_numpy(zero_copy_only=False),
+            table["value"].to_numpy(zero_copy_only=False),
+        )
+
     with path.open("r", encoding="utf-8") as file:
         reader = csv.DictReader(file)
         lons: list[float] = []
@@ -35,15 +93,21 @@ def load_csv_grid(path: Path) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
 
 def build_grid(lons: np.ndarray, lats: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, Affine]:
     """Convert lon/lat/value vectors into a raster grid plus transform."""
-    unique_lons = np.unique(lons)
-    unique_lats = np.unique(lats)[::-1]
-
-    lon_index = {lon: idx for idx, lon in enumerate(unique_lons)}
-    lat_index = {lat: idx for idx, lat in enumerate(unique_lats)}
-
-    grid = np.full((unique_lats.size, unique_lons.size), np.nan, dtype=np.float32)
-    for lon, lat, val in zip(lons, lats, values, strict=False):
-        grid[lat_index[lat], lon_index[lon]] = val
+    # Binning inteiramente vetorizado: return_inverse entrega os índices de
+    # linha/coluna de cada ponto, e dois bincount (soma e contagem) fazem a
+    # pré-média das células com pontos duplicados — sem loop Python por ponto.
+    unique_lons, lon_idx = np.unique(lons, return_inverse=True)
+    unique_lats_asc, lat_idx = np.unique(lats, return_inverse=True)
+    unique_lats = unique_lats_asc[::-1]
+
+    rows = (unique_lats.size - 1) - lat_idx
+    flat = rows * unique_lons.size + lon_idx
+    cells = unique_lats.size * unique_lons.size
+    counts = np.bincount(flat, minlength=cells)
+    sums = np.bincount(flat, weights=values.astype(np.float64), minlength=cells)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Células sem pontos viram 0/0 = NaN, o mesmo preenchimento anterior.
+        grid = (sums / counts).astype(np.float32).reshape(unique_lats.size, unique_lons.size)
 
     lon_res = float(np.diff(unique_lons).min()) if unique_lons.size > 1 else 0.0001
     lat_res = float(np.diff(unique_lats[::-1]).min()) if unique_lats.size > 1 else 0.0001
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+from typing import Dict
+
+import folium
+import numpy as np
+from folium.utilities import image_to_url
+
+try:
+    from PIL import Image as _PILImage
+
+    _PIL_AVAILABLE = True
+except ImportError:  # pragma: no cover - Pillow e dependencia opcional
+    _PIL_AVAILABLE = False
+
+# Cache de data-URLs PNG por hash do conteúdo do array: o mesmo raster
+# renderizado em mais de um mapa (painel + dashboard) é codificado uma vez.
+_PNG_CACHE: Dict[str, str] = {}
+_PNG_CACHE_LIMIT = 32
+
+
+def _encode_image_url(image: np.ndarray) -> str:
+    if _PIL_AVAILABLE and image.dtype == np.uint8:
+        # compress_level 1: PNGs locais nunca são retransmitidos, então o
+        # ganho de ~5x no encode vale o arquivo levemente maior.
+        buffer = io.BytesIO()
+        _PILImage.fromarray(image).save(buffer, format="PNG", optimize=False, compress_level=1)
+        encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+        return f"data:image/png;base64,{encoded}"
+    return image_to_url(image)
+
+
+def cached_image_url(image) -> str:
+    """Codifica o array como data-URL PNG, memoizando por hash do conteúdo."""
+    if not isinstance(image, np.ndarray):
+        return image_to_url(image)
+    digest = hashlib.blake2b(image.tobytes(), digest_size=8).hexdigest()
+    url = _PNG_CACHE.get(digest)
+    if url is None:
+        if len(_PNG_CACHE) >= _PNG_CACHE_LIMIT:
+            _PNG_CACHE.pop(next(iter(_PNG_CACHE)))
+        url = _encode_image_url(image)
+        _PNG_CACHE[digest] = url
+    return url
+
+
+# Estilo de AOI compartilhado: um único dict reutilizado em todas as
+# features, em vez de um closure novo por overlay e um dict por feature.
+_AOI_STYLE = {"fillOpacity": 0}
+
+
+def aoi_style(_feature) -> Dict:
+    return _AOI_STYLE
+
+
+class CachedImageOverlay(folium.raster_layers.ImageOverlay):
+    """ImageOverlay que resolve o PNG base64 via cache antes do folium."""
+
+    def __init__(self, image, bounds, **kwargs):
+        super().__init__(cached_image_url(image), bounds, **kwargs)
@@ -1,16 +1,54 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Iterable, Optional, Tuple
 import json
 
+try:
+    import orjson
 
-def load_geojson(path: Path) -> Dict[str, Any]:
-    """Read a GeoJSON file and return its geometry dict."""
-    with path.open("r", encoding="utf-8") as file:
+    _ORJSON_AVAILABLE = True
+except ImportError:  # pragma: no cover - orjson e dependencia opcional
+    _ORJSON_AVAILABLE = False
+
+
+@lru_cache(maxsize=16)
+def _load_geojson_cached(path_str: str, mtime_ns: int) -> Dict[str, Any]:
+    # orjson (parser em C) decodifica GeoJSONs grandes ~5x mais rapido
+    # que o json da stdlib; o fallback mantem o comportamento identico.
+    if _ORJSON_AVAILABLE:
+        with open(path_str, "rb") as file:
+            return orjson.loads(file.read())
+    with open(path_str, "r", encoding="utf-8") as file:
         return json.load(file)
 
 
+def load_geojson(path: Path) -> Dict[str, Any]:
+    """Read a GeoJSON file and return its geometry dict.
+
+    O resultado é cacheado por (caminho, mtime): os mesmos overlays são
+    recarregados por cada renderer/CSV dentro de um mesmo processo.
+    """
+    path = Path(path)
+    return _load_geojson_cached(str(path), path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=16)
+def _geojson_bounds_cached(path_str: str, mtime_ns: int) -> Optional[Tuple[float, float, float, float]]:
+    return extract_geometry_bounds(_load_geojson_cached(path_str, mtime_ns))
+
+
+def load_geojson_bounds(path: Path) -> Optional[Tuple[float, float, float, float]]:
+    """Bounding box do GeoJSON, cacheado por (caminho, mtime) como o parse.
+
+    Evita re-percorrer as coordenadas do polígono a cada render quando o
+    mesmo overlay alimenta vários renderers no mesmo processo.
+    """
+    path = Path(path)
+    return _geojson_bounds_cached(str(path), path.stat().st_mtime_ns)
+
+
 def iterate_geometries(geometry: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
     """Yield Polygon geometries from a GeoJSON structure."""
     gtype = geometry.get("type")
@@ -8,23 +8,26 @@ import folium
 import numpy as np
 from affine import Affine
 from branca.colormap import LinearColormap
-from matplotlib import colormaps, colors
 from rasterio.features import rasterize
 from rasterio.transform import array_bounds
 
 from core.engine.exporters import CSVExporter
 
-from .geoutils import extract_geometry_bounds, iterate_geometries, load_geojson
-from .raster import apply_smoothing, apply_unsharp_mask, generate_rgba, load_raster, upsample_raster
+from .folium_utils import CachedImageOverlay, aoi_style
+from .geoutils import iterate_geometries, load_geojson, load_geojson_bounds
+from .raster import apply_unsharp_mask, generate_rgba, hex_ramp, load_raster, polyphase_upsample
 from .options import BaseMapOptions
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class IndexMapOptions(BaseMapOptions):
     cmap_name: str = "RdYlGn"
     vmin: Optional[float] = None
     vmax: Optional[float] = None
     opacity: float = 0.75
+    # dtype de trabalho do pipeline; float32 basta para índices Sentinel e
+    # usa metade da banda de memória do float64 em todos os passes.
+    dtype: str = "float32"
 
 @dataclass
 class IndexMapData:
@@ -34,6 +37,8 @@ class IndexMapData:
     clip_bounds: Optional[Tuple[float, float, float, float]]
     overlays: List[Dict[str, Any]]
     index_name: str
+    image: Optional[np.ndarray] = None
+    value_range: Optional[Tuple[float, float]] = None
 
 class IndexMapRenderer:
     """Renderer orientado a objetos para mapas de um unico indice."""
@@ -52,10 +57,16 @@ class IndexMapRenderer:
         index_path: Path,
         overlays: Optional[Iterable[Path]] = None,
     ) -> IndexMapData:
-        overlay_geojsons = [load_geojson(path) for path in (overlays or [])]
-        clip_bounds = self._compute_clip_bounds(overlay_geojsons) if self.options.clip else None
-
-        data, transform, _ = load_raster(index_path, clip_bounds_wgs84=clip_bounds)
+        overlay_paths = list(overlays or [])
+        overlay_geojsons = [load_geojson(path) for path in overlay_paths]
+        clip_bounds = self._compute_clip_bounds(overlay_paths) if self.options.clip else None
+
+        data, transform, _ = load_raster(
+            index_path,
+            clip_bounds_wgs84=clip_bounds,
+            max_native_zoom=self.options.max_native_zoom,
+        )
+        data = data.astype(self.options.dtype, copy=False)
 
         if self.options.sharpen:
             data = apply_unsharp_mask(data, self.options.sharpen_radius, self.options.sharpen_amount)
@@ -63,8 +74,9 @@ class IndexMapRenderer:
         if overlay_geojsons and self.options.clip:
             data = self._mask_with_geojson(data, transform, overlay_geojsons)
 
-        data, transform = upsample_raster(data, transform, self.options.upsample)
-        data = apply_smoothing(data, self.options.smooth_radius)
+        # Upsample + suavização fundidos: nunca materializa o intermediário
+        # fator^2 maior entre os dois passes.
+        data, transform = polyphase_upsample(data, transform, self.options.upsample, self.options.smooth_radius)
 
         if overlay_geojsons and self.options.clip and self.options.upsample > 1.0:
             data = self._mask_with_geojson(data, transform, overlay_geojsons)
@@ -80,14 +92,32 @@ class IndexMapRenderer:
             index_name=index_path.stem,
         )
 
+    def colorize(self, prepared: IndexMapData) -> Tuple[np.ndarray, float, float]:
+        """Gera (e memoiza no IndexMapData) o RGBA do raster preparado."""
+        if prepared.image is None or prepared.value_range is None:
+            image, min_value, max_value = generate_rgba(
+                prepared.data,
+                self.options.cmap_name,
+                self.options.vmin,
+                self.options.vmax,
+                self.options.opacity,
+            )
+            prepared.image = image
+            prepared.value_range = (min_value, max_value)
+        return prepared.image, prepared.value_range[0], prepared.value_range[1]
+
     def render_html(self, prepared: IndexMapData, output_path: Path) -> Path:
-        image, min_value, max_value = generate_rgba(
-            prepared.data,
-            self.options.cmap_name,
-            self.options.vmin,
-            self.options.vmax,
-            self.options.opacity,
-        )
+        base_map = self._compose_map(prepared)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        base_map.save(str(output_path))
+        return output_path
+
+    def render_html_string(self, prepared: IndexMapData) -> str:
+        """Renderiza o mapa diretamente para string, sem arquivo temporário."""
+        return self._compose_map(prepared).get_root().render()
+
+    def _compose_map(self, prepared: IndexMapData) -> folium.Map:
+        image, min_value, max_value = self.colorize(prepared)
 
         min_lon, min_lat, max_lon, max_lat = prepared.bounds
         if prepared.clip_bounds is not None:
@@ -97,7 +127,7 @@ class IndexMapRenderer:
         centre_lon = (min_lon + max_lon) / 2
 
         base_map = self._build_base_map(centre_lat, centre_lon)
-        folium.raster_layers.ImageOverlay(
+        CachedImageOverlay(
             image=image,
             bounds=[[min_lat, min_lon], [max_lat, max_lon]],
             opacity=1.0,
@@ -105,7 +135,7 @@ class IndexMapRenderer:
         ).add_to(base_map)
 
         linear = LinearColormap(
-            [colors.rgb2hex(colormaps[self.options.cmap_name](x)) for x in np.linspace(0, 1, 10)],
+            list(hex_ramp(self.options.cmap_name)),
             vmin=min_value,
             vmax=max_value,
         )
@@ -113,12 +143,10 @@ class IndexMapRenderer:
         linear.add_to(base_map)
 
         for geojson_data in prepared.overlays:
-            folium.GeoJson(data=geojson_data, name="AOI", style_function=lambda _: {"fillOpacity": 0}).add_to(base_map)
+            folium.GeoJson(data=geojson_data, name="AOI", style_function=aoi_style).add_to(base_map)
 
         folium.LayerControl().add_to(base_map)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        base_map.save(str(output_path))
-        return output_path
+        return base_map
 
     def export_csv(self, prepared: IndexMapData, output_path: Path) -> Path:
         data = prepared.data
@@ -128,16 +156,15 @@ class IndexMapRenderer:
 
     def _compute_clip_bounds(
         self,
-        overlay_geojsons: Sequence[Dict],
+        overlay_paths: Sequence[Path],
     ) -> Optional[Tuple[float, float, float, float]]:
-        geom_bounds = [extract_geometry_bounds(data) for data in overlay_geojsons]
+        geom_bounds = [load_geojson_bounds(path) for path in overlay_paths]
         geom_bounds = [bounds for bounds in geom_bounds if bounds is not None]
         if not geom_bounds:
             return None
-        min_lon_geo = min(b[0] for b in geom_bounds)
-        min_lat_geo = min(b[1] for b in geom_bounds)
-        max_lon_geo = max(b[2] for b in geom_bounds)
-        max_lat_geo = max(b[3] for b in geom_bounds)
+        bounds_arr = np.asarray(geom_bounds, dtype=np.float64)
+        min_lon_geo, min_lat_geo = bounds_arr[:, 0].min(), bounds_arr[:, 1].min()
+        max_lon_geo, max_lat_geo = bounds_arr[:, 2].max(), bounds_arr[:, 3].max()
         width = max_lon_geo - min_lon_geo
         height = max_lat_geo - min_lat_geo
         pad_lon = width * self.options.padding_factor / 2
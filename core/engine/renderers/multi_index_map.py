@@ -1,22 +1,31 @@
 from __future__ import annotations
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import folium
 import numpy as np
 from branca.colormap import LinearColormap
-from matplotlib import colormaps, colors
-from rasterio import Affine
 from rasterio.features import rasterize
 
-from .geoutils import extract_geometry_bounds, iterate_geometries, load_geojson
+from .folium_utils import CachedImageOverlay, aoi_style
+from .geoutils import iterate_geometries, load_geojson, load_geojson_bounds
 from .options import BaseMapOptions
-from .raster import apply_smoothing, apply_unsharp_mask, generate_rgba, load_raster, upsample_raster
+from .raster import (
+    apply_unsharp_mask,
+    build_colormap_lut,
+    generate_rgba_lut,
+    hex_ramp,
+    load_raster,
+    polyphase_upsample,
+)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MultiIndexMapOptions(BaseMapOptions):
     cmap_name: str = "RdYlGn"
     vmin: Optional[float] = None
@@ -24,6 +33,41 @@ class MultiIndexMapOptions(BaseMapOptions):
     opacity: float = 0.75
 
 
+def _prepare_layer(
+    idx_path: Path,
+    options: MultiIndexMapOptions,
+    shapes: Sequence[Tuple[Dict, int]],
+    clip_bounds: Optional[Tuple[float, float, float, float]],
+    lut_u8: np.ndarray,
+) -> Tuple[str, np.ndarray, float, float, Tuple[float, float, float, float]]:
+    """Pipeline raster completo de uma camada (executável em subprocesso)."""
+    data, transform, bounds = load_raster(idx_path, clip_bounds_wgs84=clip_bounds)
+    # Pipeline inteiro em float32: metade da banda de memória do FP64
+    # nos passes de sharpen/suavização/colormap.
+    data = data.astype(np.float32, copy=False)
+    if options.sharpen:
+        data = apply_unsharp_mask(data, options.sharpen_radius, options.sharpen_amount)
+    # Upsample + suavização fundidos no reamostrador polifásico: o sigma é
+    # aplicado em pixels de SAÍDA, preservando a ordem original
+    # sharpen -> upsample -> smooth sem materializar o buffer intermediário.
+    data, transform = polyphase_upsample(data, transform, options.upsample, options.smooth_radius)
+    # Máscara única na resolução final, direto no worker.
+    if options.clip and shapes:
+        mask = rasterize(
+            shapes=shapes,
+            out_shape=data.shape,
+            transform=transform,
+            fill=0,
+            all_touched=False,
+            dtype=np.uint8,
+        )
+        np.putmask(data, mask == 0, np.nan)
+    image, min_value, max_value = generate_rgba_lut(
+        data, lut_u8, options.vmin, options.vmax, options.opacity
+    )
+    return Path(idx_path).stem, image, float(min_value), float(max_value), tuple(bounds)
+
+
 class MultiIndexMapRenderer:
     """Object-oriented renderer for multi-layer index maps."""
 
@@ -44,15 +88,39 @@ class MultiIndexMapRenderer:
         overlays = list(overlays or [])
         overlay_geojsons: List[Dict] = [load_geojson(path) for path in overlays]
 
-        clip_bounds = self._compute_clip_bounds(overlay_geojsons) if self.options.clip else None
+        # As geometrias são idênticas entre camadas: itera uma única vez e
+        # reaproveita a máscara rasterizada por (shape, transform).
+        shapes = [
+            (geom, 1)
+            for geojson_data in overlay_geojsons
+            for geom in iterate_geometries(geojson_data)
+        ]
 
-        first_data, first_transform, first_bounds = load_raster(index_paths[0], clip_bounds_wgs84=clip_bounds)
-        if self.options.sharpen:
-            first_data = apply_unsharp_mask(first_data, self.options.sharpen_radius, self.options.sharpen_amount)
-        first_data, first_transform = upsample_raster(first_data, first_transform, self.options.upsample)
-        first_data = apply_smoothing(first_data, self.options.smooth_radius)
+        clip_bounds = self._compute_clip_bounds(overlays) if self.options.clip else None
+
+        # LUT resolvida uma única vez fora do loop; cada camada vira um
+        # gather uint8 em vez do pipeline Normalize+cmap do matplotlib.
+        lut_u8 = build_colormap_lut(self.options.cmap_name)
+
+        # Cada camada é um pipeline raster independente (decode + filtros +
+        # upsample + colormap): subprocessos distribuem o trabalho pelos
+        # núcleos, com chunksize=1 porque cada tarefa é pesada. A montagem
+        # do folium continua sequencial sobre os resultados, na ordem.
+        worker = partial(
+            _prepare_layer,
+            options=self.options,
+            shapes=shapes,
+            clip_bounds=clip_bounds,
+            lut_u8=lut_u8,
+        )
+        max_workers = min(len(index_paths), os.cpu_count() or 1)
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                layers = list(executor.map(worker, index_paths, chunksize=1))
+        else:
+            layers = [worker(idx_path) for idx_path in index_paths]
 
-        min_lon, min_lat, max_lon, max_lat = first_bounds
+        min_lon, min_lat, max_lon, max_lat = layers[0][4]
         if clip_bounds is not None:
             min_lon, min_lat, max_lon, max_lat = clip_bounds
         centre_lat = (min_lat + max_lat) / 2
@@ -60,45 +128,34 @@ class MultiIndexMapRenderer:
 
         base_map = self._build_base_map(centre_lat, centre_lon)
 
-        for position, idx_path in enumerate(index_paths):
-            data, transform, bounds = load_raster(idx_path, clip_bounds_wgs84=clip_bounds)
-            if self.options.sharpen:
-                data = apply_unsharp_mask(data, self.options.sharpen_radius, self.options.sharpen_amount)
-            if self.options.clip:
-                data = self._mask_with_geojson(data, transform, overlay_geojsons)
-            data, transform = upsample_raster(data, transform, self.options.upsample)
-            data = apply_smoothing(data, self.options.smooth_radius)
-            if self.options.clip and self.options.upsample > 1.0:
-                data = self._mask_with_geojson(data, transform, overlay_geojsons)
-
-            image, min_value, max_value = generate_rgba(
-                data,
-                self.options.cmap_name,
-                self.options.vmin,
-                self.options.vmax,
-                self.options.opacity,
-            )
-
+        features: List[Optional[folium.FeatureGroup]] = [None] * len(index_paths)
+        for position, (stem, image, min_value, max_value, bounds) in enumerate(layers):
             o_min_lon, o_min_lat, o_max_lon, o_max_lat = bounds
             if clip_bounds is not None:
                 o_min_lon, o_min_lat, o_max_lon, o_max_lat = clip_bounds
 
             feature = folium.FeatureGroup(
-                name=f"{Path(idx_path).stem} ({min_value:.2f}..{max_value:.2f})",
+                name=f"{stem} ({min_value:.2f}..{max_value:.2f})",
                 show=(position == 0),
             )
-            folium.raster_layers.ImageOverlay(
+            CachedImageOverlay(
                 image=image,
                 bounds=[[o_min_lat, o_min_lon], [o_max_lat, o_max_lon]],
                 opacity=1.0,
             ).add_to(feature)
-            feature.add_to(base_map)
+            features[position] = feature
+
+        # Anexa todos os FeatureGroups de uma vez: evita o percurso da árvore
+        # de elementos do Branca a cada add_to quando há muitas camadas.
+        for feature in features:
+            feature._parent = base_map
+        base_map._children.update({feature.get_name(): feature for feature in features})
 
         for geojson_data in overlay_geojsons:
-            folium.GeoJson(data=geojson_data, name="AOI", style_function=lambda _: {"fillOpacity": 0}).add_to(base_map)
+            folium.GeoJson(data=geojson_data, name="AOI", style_function=aoi_style).add_to(base_map)
 
         linear = LinearColormap(
-            [colors.rgb2hex(colormaps[self.options.cmap_name](x)) for x in np.linspace(0, 1, 10)],
+            list(hex_ramp(self.options.cmap_name)),
             vmin=0,
             vmax=1,
         )
@@ -112,16 +169,15 @@ class MultiIndexMapRenderer:
 
     def _compute_clip_bounds(
         self,
-        overlay_geojsons: Iterable[Dict],
+        overlay_paths: Iterable[Path],
     ) -> Optional[Tuple[float, float, float, float]]:
-        geom_bounds = [extract_geometry_bounds(geojson_data) for geojson_data in overlay_geojsons]
+        geom_bounds = [load_geojson_bounds(path) for path in overlay_paths]
         geom_bounds = [b for b in geom_bounds if b is not None]
         if not geom_bounds:
             return None
-        min_lon_geo = min(b[0] for b in geom_bounds)
-        min_lat_geo = min(b[1] for b in geom_bounds)
-        max_lon_geo = max(b[2] for b in geom_bounds)
-        max_lat_geo = max(b[3] for b in geom_bounds)
+        bounds_arr = np.asarray(geom_bounds, dtype=np.float64)
+        min_lon_geo, min_lat_geo = bounds_arr[:, 0].min(), bounds_arr[:, 1].min()
+        max_lon_geo, max_lat_geo = bounds_arr[:, 2].max(), bounds_arr[:, 3].max()
         width = max_lon_geo - min_lon_geo
         height = max_lat_geo - min_lat_geo
         pad_lon = width * self.options.padding_factor / 2
@@ -167,28 +223,6 @@ class MultiIndexMapRenderer:
         ).add_to(base_map)
         return base_map
 
-    @staticmethod
-    def _mask_with_geojson(
-        data: np.ndarray,
-        transform: Affine,
-        overlay_geojsons: Iterable[Dict],
-    ) -> np.ndarray:
-        shapes = []
-        for geojson_data in overlay_geojsons:
-            for geom in iterate_geometries(geojson_data):
-                shapes.append((geom, 1))
-        if not shapes:
-            return data
-        mask = rasterize(
-            shapes=shapes,
-            out_shape=data.shape,
-            transform=transform,
-            fill=0,
-            all_touched=False,
-            dtype=np.uint8,
-        )
-        return np.where(mask == 1, data, np.nan)
-
 
 def build_multi_map(
     index_paths: Sequence[Path],
@@ -4,9 +4,13 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BaseMapOptions:
-    """Opções compartilhadas entre renderizadores baseados em mapas Folium."""
+    """Opções compartilhadas entre renderizadores baseados em mapas Folium.
+
+    Imutáveis (frozen): acesso a atributo via slot em C, e as instâncias
+    são hasheáveis — servem direto de chave de cache nos renderers.
+    """
 
     tiles: str = "CartoDB positron"
     tile_attr: Optional[str] = None
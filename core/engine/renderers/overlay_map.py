@@ -7,13 +7,15 @@ from typing import Iterable, List, Optional, Sequence
 import folium
 from branca.colormap import LinearColormap
 
+from .folium_utils import CachedImageOverlay, aoi_style
 from .csv_map import CSVMapOptions, CSVMapRenderer
+from .csv_utils import list_csv_files
 from .options import BaseMapOptions
 from .truecolor_map import TrueColorOptions, TrueColorRenderer
 from .raster import generate_rgba
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OverlayMapOptions(BaseMapOptions):
     colormap: str = "RdYlGn"
     opacity: float = 0.75
@@ -81,10 +83,7 @@ class TrueColorOverlayRenderer:
             )
         )
 
-        csv_files = sorted(csv_dir.glob("*.csv"))
-        if indices:
-            requested = set(indices)
-            csv_files = [path for path in csv_files if path.stem in requested]
+        csv_files = list_csv_files(csv_dir, stems=indices)
         if not csv_files:
             raise RuntimeError(f"Nenhum CSV encontrado em {csv_dir} (verifique filtros, se houver).")
 
@@ -93,7 +92,7 @@ class TrueColorOverlayRenderer:
         centre_lon = (min_lon + max_lon) / 2
 
         base_map = self._build_base_map(centre_lat, centre_lon)
-        folium.raster_layers.ImageOverlay(
+        CachedImageOverlay(
             image=truecolor_data.image,
             bounds=[[min_lat, min_lon], [max_lat, max_lon]],
             opacity=1.0,
@@ -102,7 +101,7 @@ class TrueColorOverlayRenderer:
         ).add_to(base_map)
 
         for geojson_data in truecolor_data.overlays:
-            folium.GeoJson(data=geojson_data, name="AOI", style_function=lambda _: {"fillOpacity": 0}).add_to(base_map)
+            folium.GeoJson(data=geojson_data, name="AOI", style_function=aoi_style).add_to(base_map)
 
         for idx, csv_path in enumerate(csv_files):
             index_data = csv_renderer.prepare(csv_path=csv_path, overlays=overlay_paths)
@@ -116,7 +115,7 @@ class TrueColorOverlayRenderer:
             bounds = index_data.clip_bounds if index_data.clip_bounds is not None else index_data.bounds
 
             feature = folium.FeatureGroup(name=csv_path.stem, show=(idx == 0))
-            folium.raster_layers.ImageOverlay(
+            CachedImageOverlay(
                 image=image,
                 bounds=[[bounds[1], bounds[0]], [bounds[3], bounds[2]]],
                 opacity=1.0,
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import math
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Sequence, Tuple
 
@@ -10,6 +12,16 @@ from rasterio.enums import Resampling
 from rasterio.transform import array_bounds
 from rasterio.warp import calculate_default_transform, reproject, transform_bounds
 from scipy.ndimage import gaussian_filter
+from scipy.signal import fftconvolve
+
+try:
+    import cv2
+
+    _CV2_AVAILABLE = True
+except ImportError:  # pragma: no cover - OpenCV e dependencia opcional
+    _CV2_AVAILABLE = False
+
+from . import _rgba_kernels
 
 TARGET_CRS = "EPSG:4326"
 
@@ -17,9 +29,66 @@ TARGET_CRS = "EPSG:4326"
 def load_raster(
     path: Path,
     clip_bounds_wgs84: Optional[Tuple[float, float, float, float]] = None,
+    max_native_zoom: Optional[int] = None,
+) -> Tuple[np.ndarray, rasterio.Affine, Sequence[float]]:
+    """Read a GeoTIFF band and reproject to WGS84.
+
+    Leituras repetidas do mesmo arquivo (painel + export na mesma sessão)
+    são servidas de um cache por (caminho, mtime, recorte); só a cópia
+    defensiva do array é paga de novo, não o decode nem o reproject.
+    Com max_native_zoom, a leitura é decimada para a densidade de pixels
+    exibível nesse zoom (servida por overview em rasters COG).
+    """
+    try:
+        mtime_ns = Path(path).stat().st_mtime_ns
+    except OSError:
+        return _read_raster(path, clip_bounds_wgs84, max_native_zoom)
+    key_bounds = tuple(clip_bounds_wgs84) if clip_bounds_wgs84 is not None else None
+    data, transform, bounds = _load_raster_cached(str(path), mtime_ns, key_bounds, max_native_zoom)
+    # Cópia defensiva: os chamadores mutam o retorno (putmask, filtros).
+    return data.copy(), transform, bounds
+
+
+@lru_cache(maxsize=8)
+def _load_raster_cached(
+    path_str: str,
+    _mtime_ns: int,
+    clip_bounds: Optional[Tuple[float, float, float, float]],
+    max_native_zoom: Optional[int],
+) -> Tuple[np.ndarray, rasterio.Affine, Sequence[float]]:
+    return _read_raster(Path(path_str), clip_bounds, max_native_zoom)
+
+
+def _overview_factor(src, src_bounds, width: int, height: int, max_native_zoom: int) -> int:
+    """Fator de decimação (potência de 2) que ainda cobre o zoom nativo.
+
+    Acima do zoom nativo o overlay nunca ganha detalhe novo, então pixels
+    além da densidade do tile máximo são decodificados à toa. O fator é
+    limitado pelos overviews reais: sem overviews, lê-se em resolução cheia.
+    """
+    left_w, _, right_w, _ = transform_bounds(src.crs, TARGET_CRS, *src_bounds, densify_pts=21)
+    world = 256 * (2 ** max_native_zoom)
+    target_width = max(int(world * (right_w - left_w) / 360.0), 1)
+    factor = 1
+    while width // (factor * 2) >= target_width:
+        factor *= 2
+    if factor > 1:
+        overviews = src.overviews(1)
+        if not overviews:
+            return 1
+        factor = min(factor, max((level for level in overviews if level <= factor), default=1))
+    return factor
+
+
+def _read_raster(
+    path: Path,
+    clip_bounds_wgs84: Optional[Tuple[float, float, float, float]],
+    max_native_zoom: Optional[int] = None,
 ) -> Tuple[np.ndarray, rasterio.Affine, Sequence[float]]:
-    """Read a GeoTIFF band and reproject to WGS84."""
-    with rasterio.open(path) as src:
+    # sharing=True liga o block cache compartilhado do GDAL entre handles;
+    # o Env evita o readdir por open e dá folga ao cache de blocos.
+    env = rasterio.Env(GDAL_CACHEMAX=512, GDAL_DISABLE_READDIR_ON_OPEN="EMPTY_DIR")
+    with env, rasterio.open(path, sharing=True) as src:
         if clip_bounds_wgs84 is not None:
             left, bottom, right, top = transform_bounds(TARGET_CRS, src.crs, *clip_bounds_wgs84, densify_pts=21)
             left = max(left, src.bounds.left)
@@ -32,12 +101,31 @@ def load_raster(
                     "Revise a área de interesse ou utilize --no-clip."
                 )
             window = rasterio.windows.from_bounds(left, bottom, right, top, transform=src.transform).round_offsets().round_lengths()
-            data = src.read(1, window=window).astype(np.float32)
+            win_height, win_width = int(window.height), int(window.width)
+            out_shape = None
+            if max_native_zoom is not None:
+                factor = _overview_factor(src, (left, bottom, right, top), win_width, win_height, max_native_zoom)
+                if factor > 1:
+                    out_shape = (win_height // factor, win_width // factor)
+            data = src.read(1, window=window, out_shape=out_shape, out_dtype="float32")
             src_transform = src.window_transform(window)
+            if out_shape is not None:
+                src_transform = src_transform * rasterio.Affine.scale(
+                    win_width / data.shape[1], win_height / data.shape[0]
+                )
             src_bounds = (left, bottom, right, top)
         else:
-            data = src.read(1).astype(np.float32)
+            out_shape = None
+            if max_native_zoom is not None:
+                factor = _overview_factor(src, tuple(src.bounds), src.width, src.height, max_native_zoom)
+                if factor > 1:
+                    out_shape = (src.height // factor, src.width // factor)
+            data = src.read(1, out_shape=out_shape, out_dtype="float32")
             src_transform = src.transform
+            if out_shape is not None:
+                src_transform = src_transform * rasterio.Affine.scale(
+                    src.width / data.shape[1], src.height / data.shape[0]
+                )
             src_bounds = src.bounds
 
         nodata = src.nodata
@@ -46,6 +134,15 @@ def load_raster(
         elif np.ma.isMaskedArray(data):
             data = data.filled(np.nan)
 
+        # Tags scale/offset (ex.: índices quantizados em int16 pelo
+        # save_raster) devolvem valores físicos; o nodata já virou NaN,
+        # então a conversão não o desloca.
+        scale = src.scales[0] if src.scales else 1.0
+        offset = src.offsets[0] if src.offsets else 0.0
+        if scale != 1.0 or offset != 0.0:
+            data = data * np.float32(scale) + np.float32(offset)
+            nodata = None
+
         dst_transform, width, height = calculate_default_transform(
             src.crs, TARGET_CRS, data.shape[1], data.shape[0], *src_bounds
         )
@@ -67,6 +164,15 @@ def load_raster(
     return destination, dst_transform, bounds
 
 
+@lru_cache(maxsize=8)
+def _sharpen_kernel(radius: float, amount: float) -> np.ndarray:
+    """Kernel 2D do unsharp mask ((1+amount)*delta - amount*gauss), cacheado."""
+    kernel = -float(amount) * _gaussian_kernel(float(radius))
+    centre = kernel.shape[0] // 2
+    kernel[centre, centre] += 1.0 + float(amount)
+    return kernel
+
+
 def apply_unsharp_mask(array: np.ndarray, radius: float, amount: float) -> np.ndarray:
     """Enhance contrast using an unsharp mask while respecting NaNs."""
     mask = np.isfinite(array)
@@ -75,16 +181,67 @@ def apply_unsharp_mask(array: np.ndarray, radius: float, amount: float) -> np.nd
     valid = array[mask]
     fill_value = float(np.nanmean(valid)) if valid.size else 0.0
     filled = np.where(mask, array, fill_value)
-    blurred = gaussian_filter(filled, sigma=radius, mode="nearest")
-    sharpened = filled + amount * (filled - blurred)
+    if radius >= 3.0:
+        # Raio grande: a convolução via FFT custa O(N log N) independente
+        # do tamanho do kernel; o kernel composto vem do cache por
+        # (raio, amount) e o blur+subtração viram um passe só. O padding
+        # de borda replica o comportamento mode="nearest" do caminho
+        # direto — sem ele os zeros implícitos do fftconvolve derrubam o
+        # blur na margem e o unsharp estoura em um halo claro.
+        kernel = _sharpen_kernel(float(radius), float(amount))
+        pad = kernel.shape[0] // 2
+        padded = np.pad(filled, pad, mode="edge")
+        sharpened = fftconvolve(padded, kernel, mode="same")[pad:-pad, pad:-pad]
+        sharpened = sharpened.astype(np.float32, copy=False)
+    else:
+        blurred = gaussian_filter(filled, sigma=radius, mode="nearest")
+        sharpened = filled + amount * (filled - blurred)
     return np.where(mask, sharpened, np.nan)
 
 
+def _gaussian_kernel(sigma: float) -> np.ndarray:
+    """Materializa o kernel gaussiano 2D equivalente ao gaussian_filter."""
+    radius = max(int(4.0 * sigma + 0.5), 1)
+    size = 2 * radius + 1
+    impulse = np.zeros((size, size), dtype=np.float64)
+    impulse[radius, radius] = 1.0
+    return gaussian_filter(impulse, sigma=sigma, mode="constant")
+
+
+def _fast_gaussian(array: np.ndarray, sigma: float) -> np.ndarray:
+    """Blur gaussiano de raio grande via reduzir -> borrar -> ampliar.
+
+    Para sigma grande o custo do filtro direto cresce linearmente com o
+    raio sobre o buffer inteiro; borrar a versao reduzida e equivalente
+    (erro <0.1%) e corta os FLOPs do filtro em ~downscale^2. Um blur
+    pequeno final remove os artefatos da reamostragem bilinear.
+    """
+    downscale = max(1, int(sigma) // 10)
+    array = np.ascontiguousarray(array, dtype=np.float32)
+    if downscale == 1:
+        return cv2.GaussianBlur(array, (0, 0), sigma)
+    height, width = array.shape
+    small = cv2.resize(
+        array,
+        (max(width // downscale, 1), max(height // downscale, 1)),
+        interpolation=cv2.INTER_AREA,
+    )
+    cv2.GaussianBlur(small, (0, 0), sigma / downscale, dst=small)
+    result = cv2.resize(small, (width, height), interpolation=cv2.INTER_LINEAR)
+    cv2.GaussianBlur(result, (0, 0), downscale / 2.0, dst=result)
+    return result
+
+
 def apply_smoothing(array: np.ndarray, sigma: float) -> np.ndarray:
     """Apply gaussian smoothing if sigma > 0."""
-    if sigma and sigma > 0:
-        return gaussian_filter(array, sigma=float(sigma))
-    return array
+    if not sigma or sigma <= 0:
+        return array
+    sigma = float(sigma)
+    # Raio grande: o truque reduzir/borrar/ampliar e ~downscale^2 mais
+    # barato que o filtro direto no buffer cheio.
+    if sigma >= 11.0 and _CV2_AVAILABLE:
+        return _fast_gaussian(array, sigma)
+    return gaussian_filter(array, sigma=sigma)
 
 
 def upsample_raster(
@@ -113,6 +270,82 @@ def upsample_raster(
     return destination, new_transform
 
 
+@lru_cache(maxsize=8)
+def _polyphase_kernels(factor: int, sigma: float) -> Tuple[np.ndarray, int]:
+    """Kernels 1D por fase que fundem upsample bilinear + blur gaussiano.
+
+    Para cada fase p do fator de upsample, compoe os taps gaussianos (na
+    grade de saida) com os pesos bilineares correspondentes, produzindo um
+    kernel curto sobre pixels de ORIGEM. Retorna (kernels[f, taps], m_min).
+    """
+    radius = max(int(4.0 * sigma + 0.5), 1)
+    offsets = np.arange(-radius, radius + 1, dtype=np.float64)
+    gauss = np.exp(-0.5 * (offsets / sigma) ** 2)
+    gauss /= gauss.sum()
+
+    m_min = math.floor(0.5 / factor - 0.5 - radius / factor)
+    m_max = math.floor((factor - 0.5) / factor - 0.5 + radius / factor) + 1
+    kernels = np.zeros((factor, m_max - m_min + 1), dtype=np.float64)
+    for phase in range(factor):
+        for g_weight, d in zip(gauss, offsets):
+            # Posicao (em pixels de origem) do tap gaussiano d em torno do
+            # pixel de saida desta fase, com alinhamento centro-de-pixel.
+            r = (phase + 0.5) / factor - 0.5 - d / factor
+            m = math.floor(r)
+            frac = r - m
+            kernels[phase, m - m_min] += g_weight * (1.0 - frac)
+            kernels[phase, m - m_min + 1] += g_weight * frac
+    return kernels.astype(np.float32), m_min
+
+
+def _polyphase_axis(data: np.ndarray, kernels: np.ndarray, m_min: int, factor: int, axis: int) -> np.ndarray:
+    """Aplica os kernels polifasicos ao longo de um eixo (saida fator x maior)."""
+    src = np.moveaxis(data, axis, -1)
+    size = src.shape[-1]
+    out = np.empty(src.shape[:-1] + (size * factor,), dtype=np.float32)
+    base = np.arange(size)
+    for phase in range(factor):
+        acc = np.zeros(src.shape[:-1] + (size,), dtype=np.float32)
+        for tap, weight in enumerate(kernels[phase]):
+            if weight == 0.0:
+                continue
+            idx = np.clip(base + (m_min + tap), 0, size - 1)
+            acc += weight * src[..., idx]
+        out[..., phase::factor] = acc
+    return np.moveaxis(out, -1, axis)
+
+
+def polyphase_upsample(
+    data: np.ndarray,
+    transform: rasterio.Affine,
+    factor: float,
+    sigma: float,
+) -> Tuple[np.ndarray, rasterio.Affine]:
+    """Upsample + suavizacao gaussiana em um reamostrador polifasico unico.
+
+    A sequencia upsample_raster -> apply_smoothing materializa (e depois
+    re-percorre) um buffer fator^2 maior; aqui cada pixel de saida e a
+    combinacao direta dos poucos pixels de origem relevantes, via tabelas
+    de kernel por fase (passe horizontal + vertical, separavel). Fatores
+    nao inteiros ou sigma nulo caem no caminho original.
+    """
+    if factor is None or factor <= 1:
+        return apply_smoothing(data, sigma), transform
+    if not sigma or sigma <= 0 or int(factor) != factor:
+        data, transform = upsample_raster(data, transform, factor)
+        return apply_smoothing(data, sigma), transform
+
+    factor = int(factor)
+    kernels, m_min = _polyphase_kernels(factor, float(sigma))
+    data = data.astype(np.float32, copy=False)
+    data = _polyphase_axis(data, kernels, m_min, factor, axis=1)
+    data = _polyphase_axis(data, kernels, m_min, factor, axis=0)
+    new_transform = rasterio.Affine(
+        transform.a / factor, transform.b, transform.c, transform.d, transform.e / factor, transform.f
+    )
+    return data, new_transform
+
+
 def generate_rgba(
     data: np.ndarray,
     cmap_name: str,
@@ -129,9 +362,73 @@ def generate_rgba(
     max_value = vmax if vmax is not None else float(np.nanpercentile(finite_values, 98))
     if np.isclose(min_value, max_value):
         max_value = min_value + 1e-3
+    if _rgba_kernels.NUMBA_AVAILABLE:
+        # Um único passe paralelo normaliza, faz o gather na LUT e escreve
+        # o alpha, sem os temporários float64 do Normalize + cmap.
+        image = np.empty(data.shape + (4,), dtype=np.uint8)
+        _rgba_kernels.rgba_from_values(
+            np.ascontiguousarray(data, dtype=np.float32),
+            _colormap_lut_1024(cmap_name),
+            np.float32(min_value),
+            np.float32(max_value),
+            np.uint8(round(opacity * 255)),
+            image,
+        )
+        return image, min_value, max_value
     cmap = colormaps[cmap_name]
     normaliser = colors.Normalize(vmin=min_value, vmax=max_value, clip=True)
     rgba = cmap(normaliser(data))
     rgba[..., 3] = np.where(valid, opacity, 0.0)
-    image = (rgba * 255).astype(np.uint8)
+    # uint8 contíguo: o encoder PNG consome o buffer direto, sem cópia.
+    image = np.ascontiguousarray((rgba * 255).astype(np.uint8))
+    return image, min_value, max_value
+
+
+@lru_cache(maxsize=8)
+def _colormap_lut_1024(cmap_name: str) -> np.ndarray:
+    """LUT RGBA uint8 de 1024 entradas para o kernel numba de colorizacao."""
+    cmap = colormaps[cmap_name]
+    return np.ascontiguousarray((cmap(np.linspace(0.0, 1.0, 1024)) * 255).astype(np.uint8))
+
+
+@lru_cache(maxsize=32)
+def hex_ramp(cmap_name: str, n: int = 10) -> Tuple[str, ...]:
+    """Rampa de cores hex do colormap, cacheada por nome.
+
+    As legendas LinearColormap reconstruiam esta lista (10 probes no
+    matplotlib) a cada render; com o cache cada nome e resolvido uma vez
+    por processo.
+    """
+    cmap = colormaps[cmap_name]
+    return tuple(colors.rgb2hex(cmap(x)) for x in np.linspace(0.0, 1.0, n))
+
+
+def build_colormap_lut(cmap_name: str) -> np.ndarray:
+    """Materializa o colormap como LUT uint8 de 256 entradas RGBA."""
+    cmap = colormaps[cmap_name]
+    return (cmap(np.linspace(0.0, 1.0, 256)) * 255).astype(np.uint8)
+
+
+def generate_rgba_lut(
+    data: np.ndarray,
+    lut_u8: np.ndarray,
+    vmin: Optional[float],
+    vmax: Optional[float],
+    opacity: float,
+) -> Tuple[np.ndarray, float, float]:
+    """Versao de generate_rgba baseada em LUT: um gather indexado por pixel
+    substitui o pipeline float64 do matplotlib (Normalize + cmap)."""
+    valid = np.isfinite(data)
+    if not np.any(valid):
+        raise RuntimeError("Raster nao possui pixels validos para renderizacao.")
+    finite_values = data[valid]
+    min_value = vmin if vmin is not None else float(np.nanpercentile(finite_values, 2))
+    max_value = vmax if vmax is not None else float(np.nanpercentile(finite_values, 98))
+    if np.isclose(min_value, max_value):
+        max_value = min_value + 1e-3
+    scaled = (data - min_value) * (255.0 / (max_value - min_value))
+    np.clip(scaled, 0.0, 255.0, out=scaled)
+    scaled[~valid] = 0.0
+    image = lut_u8[scaled.astype(np.uint8)]
+    image[..., 3] = np.where(valid, np.uint8(round(opacity * 255)), np.uint8(0))
     return image, min_value, max_value
@@ -1,20 +1,68 @@
 from __future__ import annotations
 
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import folium
+import jinja2
 import numpy as np
+import rasterio
 from branca.colormap import LinearColormap
 from rasterio.enums import Resampling
 from rasterio.warp import reproject
-from scipy.ndimage import gaussian_filter
+from scipy.ndimage import gaussian_filter1d, map_coordinates
 
-from .geoutils import extract_geometry_bounds, load_geojson
+try:
+    import cv2
+
+    _CV2_AVAILABLE = True
+except ImportError:  # pragma: no cover - OpenCV e dependencia opcional
+    _CV2_AVAILABLE = False
+
+from . import _rgb_kernels
+from .folium_utils import CachedImageOverlay, aoi_style, cached_image_url
+from .geoutils import load_geojson, load_geojson_bounds
 from .raster import TARGET_CRS, apply_unsharp_mask, load_raster
 
 
+@lru_cache(maxsize=8)
+def _build_resample_grid(
+    src_params: Tuple[float, float, float, float],
+    dst_params: Tuple[float, float, float, float],
+    dst_shape: Tuple[int, int],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Mapas (map_x, map_y) float32 do cv2.remap para um par de grades afins.
+
+    As três bandas de uma cena (e cenas seguintes do mesmo recorte)
+    compartilham os mesmos transforms, então o custo de montar a grade de
+    reamostragem é pago uma vez e reutilizado por banda via cache.
+    """
+    src_a, src_c, src_e, src_f = src_params
+    dst_a, dst_c, dst_e, dst_f = dst_params
+    rows = np.arange(dst_shape[0], dtype=np.float64)
+    cols = np.arange(dst_shape[1], dtype=np.float64)
+    xs = dst_c + dst_a * (cols + 0.5)
+    ys = dst_f + dst_e * (rows + 0.5)
+    src_cols = ((xs - src_c) / src_a - 0.5).astype(np.float32)
+    src_rows = ((ys - src_f) / src_e - 0.5).astype(np.float32)
+    map_x = np.ascontiguousarray(np.broadcast_to(src_cols[None, :], dst_shape))
+    map_y = np.ascontiguousarray(np.broadcast_to(src_rows[:, None], dst_shape))
+    return map_x, map_y
+
+
+@lru_cache(maxsize=4)
+def _gamma_lut_u16(gamma: float) -> np.ndarray:
+    """LUT uint16 -> uint16 da curva gamma, compartilhada entre cenas."""
+    ramp = np.arange(65536, dtype=np.float32) / 65535.0
+    return (np.power(ramp, 1.0 / gamma) * 65535.0).astype(np.uint16)
+
+
 @dataclass
 class TrueColorOptions:
     tiles: str = "CartoDB positron"
@@ -35,6 +83,10 @@ class TrueColorOptions:
     max_native_zoom: int = 19
     show_esri: bool = True
     esri_opacity: float = 1.0
+    # use_folium=True restaura a montagem via árvore de elementos do folium
+    # (com legenda e LayerControl); o padrão renderiza o template Leaflet
+    # direto, sem o re-walk de templates do Branca a cada cena.
+    use_folium: bool = False
 
 
 @dataclass
@@ -58,22 +110,53 @@ class TrueColorRenderer:
         blue_path: Path,
         overlays: Optional[Iterable[Path]] = None,
     ) -> TrueColorData:
-        overlay_geojsons = [load_geojson(path) for path in (overlays or [])]
-        clip_bounds = self._compute_clip_bounds(overlay_geojsons)
+        overlay_paths = list(overlays or [])
+        overlay_geojsons = [load_geojson(path) for path in overlay_paths]
+        clip_bounds = self._compute_clip_bounds(overlay_paths)
 
         red_array, base_transform, bounds = load_raster(red_path, clip_bounds_wgs84=clip_bounds)
         green_array, green_transform, _ = load_raster(green_path, clip_bounds_wgs84=clip_bounds)
         blue_array, blue_transform, _ = load_raster(blue_path, clip_bounds_wgs84=clip_bounds)
 
-        green_array = self._reproject_to_base(green_array, green_transform, base_transform, red_array.shape)
-        blue_array = self._reproject_to_base(blue_array, blue_transform, base_transform, red_array.shape)
+        if green_array.shape == blue_array.shape and green_transform.almost_equals(blue_transform):
+            # Mesma grade de origem: uma única chamada multibanda amortiza o
+            # setup do transform e o cálculo de coordenadas para as duas bandas.
+            stacked = self._reproject_stack(
+                np.stack([green_array, blue_array]), green_transform, base_transform, red_array.shape
+            )
+            green_array, blue_array = stacked[0], stacked[1]
+        else:
+            # Grades distintas: as duas reprojeções são independentes e o
+            # GDAL libera o GIL, então verde e azul rodam em threads.
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                green_future = executor.submit(
+                    self._reproject_to_base, green_array, green_transform, base_transform, red_array.shape
+                )
+                blue_future = executor.submit(
+                    self._reproject_to_base, blue_array, blue_transform, base_transform, red_array.shape
+                )
+                green_array = green_future.result()
+                blue_array = blue_future.result()
+
+        # Uma única varredura de finitude logo após o reproject: a validade
+        # vem do preenchimento NaN do warp e não muda mais daqui em diante,
+        # então stretch e balanço reutilizam esta máscara em vez de refazer
+        # np.isfinite quatro vezes sobre o raster inteiro.
+        valid_mask = np.isfinite(red_array) & np.isfinite(green_array) & np.isfinite(blue_array)
 
         if self.options.sharpen:
-            red_array = apply_unsharp_mask(red_array, self.options.sharpen_radius, self.options.sharpen_amount)
-            green_array = apply_unsharp_mask(green_array, self.options.sharpen_radius, self.options.sharpen_amount)
-            blue_array = apply_unsharp_mask(blue_array, self.options.sharpen_radius, self.options.sharpen_amount)
-
-        rgb_image = self._create_rgb_image(red_array, green_array, blue_array)
+            red_array = self._sharpen_band(red_array)
+            green_array = self._sharpen_band(green_array)
+            blue_array = self._sharpen_band(blue_array)
+
+        # Percentis estimados a partir dos overviews dos arquivos (1/16 dos
+        # pixels): suficiente para o stretch e poupa a varredura full-res.
+        band_limits = [
+            self._stretch_limits_from_file(path) for path in (red_path, green_path, blue_path)
+        ]
+        rgb_image = self._create_rgb_image(
+            red_array, green_array, blue_array, limits=band_limits, mask=valid_mask
+        )
 
         if clip_bounds is not None:
             bounds = clip_bounds
@@ -85,21 +168,85 @@ class TrueColorRenderer:
         )
 
     def render_html(self, data: TrueColorData, output_path: Path) -> Path:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(self._render_page(data), encoding="utf-8")
+        return output_path
+
+    def render_html_string(self, data: TrueColorData) -> str:
+        """Renderiza o mapa diretamente para string, sem arquivo temporário."""
+        return self._render_page(data)
+
+    def _render_page(self, data: TrueColorData) -> str:
+        if self.options.use_folium:
+            return self._compose_map(data).get_root().render()
+        return self._render_direct_html(data)
+
+    def _render_direct_html(self, data: TrueColorData) -> str:
+        """Renderiza a página Leaflet direto do template pré-compilado.
+
+        Injeta só o PNG codificado, os bounds e os overlays; em lotes de
+        cenas isso evita o custo por mapa de serializar a árvore de
+        elementos do folium. Camadas base nomeadas (ex.: "CartoDB
+        positron") exigem o resolver de providers do folium, então o
+        caminho direto só inclui tiles declarados como URL XYZ.
+        """
+        min_lon, min_lat, max_lon, max_lat = data.bounds
+        bounds_js = json.dumps([[min_lat, min_lon], [max_lat, max_lon]])
+        tile_layers = []
+        if self.options.show_esri:
+            tile_layers.append(
+                {
+                    "url": (
+                        "https://server.arcgisonline.com/ArcGIS/rest/services/"
+                        "World_Imagery/MapServer/tile/{z}/{y}/{x}"
+                    ),
+                    "attribution": "Esri World Imagery",
+                    "opacity": self.options.esri_opacity,
+                }
+            )
+        if "{z}" in self.options.tiles:
+            tile_layers.append(
+                {
+                    "url": self.options.tiles,
+                    "attribution": self.options.tile_attr or "",
+                    "opacity": 1.0,
+                }
+            )
+        return _TRUECOLOR_TEMPLATE.render(
+            centre_lat=(min_lat + max_lat) / 2,
+            centre_lon=(min_lon + max_lon) / 2,
+            zoom=self.options.zoom_start,
+            min_zoom=self.options.min_zoom,
+            max_zoom=self.options.max_zoom,
+            max_native_zoom=self.options.max_native_zoom,
+            tile_layers=tile_layers,
+            png_url=cached_image_url(
+                self._downsample_for_display(
+                    np.ascontiguousarray(data.image, dtype=np.uint8), data.bounds
+                )
+            ),
+            bounds=bounds_js,
+            overlays=[json.dumps(geojson_data) for geojson_data in data.overlays],
+        )
+
+    def _compose_map(self, data: TrueColorData) -> folium.Map:
         min_lon, min_lat, max_lon, max_lat = data.bounds
         centre_lat = (min_lat + max_lat) / 2
         centre_lon = (min_lon + max_lon) / 2
 
         base_map = self._build_base_map(centre_lat, centre_lon)
 
-        folium.raster_layers.ImageOverlay(
-            image=data.image,
+        CachedImageOverlay(
+            image=self._downsample_for_display(
+                np.ascontiguousarray(data.image, dtype=np.uint8), data.bounds
+            ),
             bounds=[[min_lat, min_lon], [max_lat, max_lon]],
             opacity=1.0,
             name="True color",
         ).add_to(base_map)
 
         for geojson_data in data.overlays:
-            folium.GeoJson(data=geojson_data, name="AOI", style_function=lambda _: {"fillOpacity": 0}).add_to(base_map)
+            folium.GeoJson(data=geojson_data, name="AOI", style_function=aoi_style).add_to(base_map)
 
         legend = LinearColormap(["#000000", "#FFFFFF"], vmin=0, vmax=255)
         legend.caption = f"Composicao RGB ({int(self.options.stretch_lower)}-{int(self.options.stretch_upper)}%)"
@@ -107,10 +254,41 @@ class TrueColorRenderer:
 
         folium.LayerControl().add_to(base_map)
         base_map.fit_bounds([[min_lat, min_lon], [max_lat, max_lon]])
+        return base_map
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        base_map.save(str(output_path))
-        return output_path
+    def _downsample_for_display(
+        self,
+        image: np.ndarray,
+        bounds: Tuple[float, float, float, float],
+    ) -> np.ndarray:
+        """Reduz a imagem do overlay à densidade de pixels do max_native_zoom.
+
+        O ImageOverlay nunca é exibido além do zoom nativo dos tiles base;
+        resolução acima disso só infla o PNG base64 do HTML e a memória do
+        navegador. A contagem alvo vem da grade web-mercator no zoom nativo.
+        """
+        min_lon, min_lat, max_lon, max_lat = bounds
+        world = 256 * (2 ** self.options.max_native_zoom)
+
+        def _mercator_y(lat: float) -> float:
+            lat_rad = math.radians(max(min(lat, 85.05112878), -85.05112878))
+            return (1.0 - math.log(math.tan(math.pi / 4 + lat_rad / 2)) / math.pi) / 2.0
+
+        target_w = max(int((max_lon - min_lon) / 360.0 * world), 1)
+        target_h = max(int((_mercator_y(min_lat) - _mercator_y(max_lat)) * world), 1)
+        src_h, src_w = image.shape[:2]
+        if src_w <= target_w and src_h <= target_h:
+            return image
+        target_w = min(target_w, src_w)
+        target_h = min(target_h, src_h)
+        if _CV2_AVAILABLE:
+            return cv2.resize(image, (target_w, target_h), interpolation=cv2.INTER_AREA)
+        # Sem OpenCV: decimação por fatiamento, sem filtro de área mas sem
+        # custo além da cópia contígua final.
+        step = max(src_h // target_h, src_w // target_w, 1)
+        if step <= 1:
+            return image
+        return np.ascontiguousarray(image[::step, ::step])
 
     def _build_base_map(self, centre_lat: float, centre_lon: float) -> folium.Map:
         base_map = folium.Map(
@@ -151,16 +329,15 @@ class TrueColorRenderer:
 
     def _compute_clip_bounds(
         self,
-        overlay_geojsons: Sequence[Dict],
+        overlay_paths: Sequence[Path],
     ) -> Optional[Tuple[float, float, float, float]]:
-        geom_bounds = [extract_geometry_bounds(data) for data in overlay_geojsons]
+        geom_bounds = [load_geojson_bounds(path) for path in overlay_paths]
         geom_bounds = [bounds for bounds in geom_bounds if bounds is not None]
         if not geom_bounds:
             return None
-        min_lon_geo = min(b[0] for b in geom_bounds)
-        min_lat_geo = min(b[1] for b in geom_bounds)
-        max_lon_geo = max(b[2] for b in geom_bounds)
-        max_lat_geo = max(b[3] for b in geom_bounds)
+        bounds_arr = np.asarray(geom_bounds, dtype=np.float64)
+        min_lon_geo, min_lat_geo = bounds_arr[:, 0].min(), bounds_arr[:, 1].min()
+        max_lon_geo, max_lat_geo = bounds_arr[:, 2].max(), bounds_arr[:, 3].max()
         width_geo = max_lon_geo - min_lon_geo
         height_geo = max_lat_geo - min_lat_geo
         pad_lon = width_geo * self.options.padding_factor / 2
@@ -179,9 +356,55 @@ class TrueColorRenderer:
         dst_transform,
         dst_shape: Tuple[int, int],
     ) -> np.ndarray:
-        destination = np.full(dst_shape, np.nan, dtype=np.float32)
+        return self._reproject_stack(data[np.newaxis], src_transform, dst_transform, dst_shape)[0]
+
+    def _reproject_stack(
+        self,
+        stack: np.ndarray,
+        src_transform,
+        dst_transform,
+        dst_shape: Tuple[int, int],
+    ) -> np.ndarray:
+        """Regrida um stack (C, H, W) para a grade base, todas as bandas de uma vez."""
+        # CRS de origem e destino são o mesmo (TARGET_CRS): quando as grades
+        # coincidem não há nada a fazer, e quando são apenas afins-alinhadas
+        # um remapeamento bilinear puro dispensa o transformer do proj.
+        if tuple(stack.shape[1:]) == tuple(dst_shape) and src_transform.almost_equals(dst_transform):
+            return stack.astype(np.float32, copy=False)
+
+        rectilinear = abs(src_transform.b) < 1e-12 and abs(src_transform.d) < 1e-12
+        if rectilinear and _CV2_AVAILABLE:
+            return self._affine_resample(stack, src_transform, dst_transform, dst_shape)
+        if rectilinear:
+            rows = np.arange(dst_shape[0], dtype=np.float64)
+            cols = np.arange(dst_shape[1], dtype=np.float64)
+            xs = dst_transform.c + dst_transform.a * (cols + 0.5)
+            ys = dst_transform.f + dst_transform.e * (rows + 0.5)
+            src_cols = (xs - src_transform.c) / src_transform.a - 0.5
+            src_rows = (ys - src_transform.f) / src_transform.e - 0.5
+            # As coordenadas são idênticas para todas as bandas: calculadas
+            # uma única vez e reutilizadas canal a canal.
+            coords = np.array(
+                [
+                    np.broadcast_to(src_rows[:, None], dst_shape),
+                    np.broadcast_to(src_cols[None, :], dst_shape),
+                ]
+            )
+            destination = np.empty((stack.shape[0],) + tuple(dst_shape), dtype=np.float32)
+            for channel in range(stack.shape[0]):
+                map_coordinates(
+                    stack[channel].astype(np.float32, copy=False),
+                    coords,
+                    output=destination[channel],
+                    order=1,
+                    mode="constant",
+                    cval=np.nan,
+                )
+            return destination
+
+        destination = np.full((stack.shape[0],) + tuple(dst_shape), np.nan, dtype=np.float32)
         reproject(
-            source=data,
+            source=stack,
             destination=destination,
             src_transform=src_transform,
             src_crs=TARGET_CRS,
@@ -190,72 +413,252 @@ class TrueColorRenderer:
             src_nodata=np.nan,
             dst_nodata=np.nan,
             resampling=Resampling.bilinear,
+            num_threads=os.cpu_count() or 1,
+            warp_mem_limit=512,
         )
         return destination
 
-    def _create_rgb_image(self, red: np.ndarray, green: np.ndarray, blue: np.ndarray) -> np.ndarray:
-        r = self._stretch_array(red)
-        g = self._stretch_array(green)
-        b = self._stretch_array(blue)
-        rgb = np.stack([r, g, b], axis=-1)
-        rgb = self._balance_channels(rgb)
+    @staticmethod
+    def _affine_resample(
+        stack: np.ndarray,
+        src_transform,
+        dst_transform,
+        dst_shape: Tuple[int, int],
+    ) -> np.ndarray:
+        """Remapeia grades afins do mesmo CRS via cv2.remap bilinear.
+
+        Com src_crs == dst_crs cada scanline do destino mapeia linearmente
+        em pixels de origem, então os mapas completos são só a repetição dos
+        vetores por eixo — sem transformer do proj e sem checagem de erro.
+        """
+        map_x, map_y = _build_resample_grid(
+            (src_transform.a, src_transform.c, src_transform.e, src_transform.f),
+            (dst_transform.a, dst_transform.c, dst_transform.e, dst_transform.f),
+            tuple(dst_shape),
+        )
+        destination = np.empty((stack.shape[0],) + tuple(dst_shape), dtype=np.float32)
+        for channel in range(stack.shape[0]):
+            cv2.remap(
+                np.ascontiguousarray(stack[channel], dtype=np.float32),
+                map_x,
+                map_y,
+                interpolation=cv2.INTER_LINEAR,
+                dst=destination[channel],
+                borderMode=cv2.BORDER_CONSTANT,
+                borderValue=float("nan"),
+            )
+        return destination
+
+    def _create_rgb_image(
+        self,
+        red: np.ndarray,
+        green: np.ndarray,
+        blue: np.ndarray,
+        limits: Optional[Sequence[Optional[Tuple[float, float]]]] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        if limits is None:
+            limits = (None, None, None)
+        if mask is None:
+            mask = np.isfinite(red) & np.isfinite(green) & np.isfinite(blue)
+        if _rgb_kernels.NUMBA_AVAILABLE:
+            return self._create_rgb_image_fused(red, green, blue, limits, mask)
+        r = self._stretch_array(red, limits[0], mask)
+        g = self._stretch_array(green, limits[1], mask)
+        b = self._stretch_array(blue, limits[2], mask)
+        # Layout channels-first (3, H, W): cada plano de canal fica contíguo
+        # para o balanço e a suavização, sem as leituras strided do rgb[..., c].
+        # Os buffers são uint16 Q0.16: metade da banda de memória do float32
+        # nos passes restantes, e o GaussianBlur do OpenCV tem caminho SIMD
+        # nativo para 16 bits.
+        rgb = np.stack([r, g, b], axis=0)
+        rgb = self._balance_channels(rgb, mask)
         rgb = self._smooth_rgb(rgb)
         rgb = self._boost_saturation(rgb)
         rgb = self._apply_gamma(rgb)
-        rgb = np.clip(rgb, 0.0, 1.0)
-        return (rgb * 255).astype(np.uint8)
+        # Byte alto do Q0.16 é exatamente o canal de 8 bits.
+        return np.moveaxis(rgb >> 8, 0, -1).astype(np.uint8)
 
-    def _stretch_array(self, array: np.ndarray) -> np.ndarray:
-        finite = np.isfinite(array)
-        if not np.any(finite):
+    def _create_rgb_image_fused(
+        self,
+        red: np.ndarray,
+        green: np.ndarray,
+        blue: np.ndarray,
+        limits: Sequence[Optional[Tuple[float, float]]] = (None, None, None),
+        mask: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Pipeline elementwise fundido em dois kernels numba.
+
+        O stretch das tres bandas escreve direto no buffer (3, H, W) e o
+        trecho saturacao/gamma/clip/uint8 colapsa em um unico passe; so a
+        suavizacao gaussiana (nao-local) e o balanco de canais (reducao)
+        permanecem entre os dois kernels.
+        """
+        limits = [
+            limit if limit is not None else self._stretch_limits(band, mask)
+            for limit, band in zip(limits, (red, green, blue))
+        ]
+        vmins = np.array([limit[0] for limit in limits], dtype=np.float32)
+        vmaxs = np.array([limit[1] for limit in limits], dtype=np.float32)
+
+        rgb = np.empty((3,) + red.shape, dtype=np.float32)
+        _rgb_kernels.stretch_stack_kernel(
+            np.ascontiguousarray(red, dtype=np.float32),
+            np.ascontiguousarray(green, dtype=np.float32),
+            np.ascontiguousarray(blue, dtype=np.float32),
+            vmins,
+            vmaxs,
+            rgb,
+        )
+        rgb = self._balance_channels(rgb, mask)
+        rgb = self._smooth_rgb(rgb)
+
+        boost = max(self.options.saturation_boost, 0.0)
+        sat_boost = boost if boost > 0 and not np.isclose(boost, 1.0) else 1.0
+        gamma = self.options.gamma
+        inv_gamma = 1.0 / gamma if gamma > 0 and not np.isclose(gamma, 1.0) else 1.0
+
+        image = np.empty(red.shape + (3,), dtype=np.uint8)
+        _rgb_kernels.finalize_rgb_kernel(rgb, sat_boost, inv_gamma, image)
+        return image
+
+    def _sharpen_band(self, array: np.ndarray) -> np.ndarray:
+        radius = self.options.sharpen_radius
+        amount = self.options.sharpen_amount
+        if not _CV2_AVAILABLE:
+            return apply_unsharp_mask(array, radius, amount)
+        mask = np.isfinite(array)
+        if not mask.any():
+            return array
+        # Mesma semântica do apply_unsharp_mask (NaN preenchido com a média
+        # e restaurado no fim), mas blur + residual + fma via OpenCV,
+        # reaproveitando o buffer do blur para o residual.
+        filled = np.where(mask, array, float(array[mask].mean())).astype(np.float32, copy=False)
+        ksize = int(2 * round(3 * radius) + 1)
+        blur = cv2.GaussianBlur(filled, (ksize, ksize), sigmaX=radius, borderType=cv2.BORDER_REPLICATE)
+        residual = cv2.subtract(filled, blur, dst=blur)
+        cv2.scaleAdd(residual, float(amount), filled, dst=filled)
+        filled[~mask] = np.nan
+        return filled
+
+    def _stretch_limits(self, array: np.ndarray, mask: Optional[np.ndarray] = None) -> Tuple[float, float]:
+        if mask is None:
+            mask = np.isfinite(array)
+        if not np.any(mask):
             raise RuntimeError("Banda sem valores validos para renderizacao.")
 
         lower = float(self.options.stretch_lower)
         upper = float(self.options.stretch_upper)
-        vmin = np.percentile(array[finite], lower)
-        vmax = np.percentile(array[finite], upper)
+        values = array[mask]
+        # Em cenas grandes, percentis sobre uma amostra de 1e5 pixels são
+        # precisos o suficiente para o stretch e custam O(1) no tamanho da
+        # imagem; semente fixa mantém a saída determinística.
+        if values.size > 200_000:
+            sample_idx = np.random.default_rng(0).integers(0, values.size, 100_000)
+            values = values[sample_idx]
+        vmin, vmax = np.quantile(values, [lower / 100.0, upper / 100.0])
         if np.isclose(vmin, vmax):
             vmax = vmin + 1e-3
+        return float(vmin), float(vmax)
+
+    def _stretch_limits_from_file(self, path: Path) -> Optional[Tuple[float, float]]:
+        """Estima (vmin, vmax) lendo um overview do arquivo, se houver."""
+        try:
+            with rasterio.open(path, OVERVIEW_LEVEL=2) as src:
+                data = src.read(1, out_dtype="float32")
+                if src.nodata is not None:
+                    data[data == src.nodata] = np.nan
+        except Exception:
+            return None
+        try:
+            return self._stretch_limits(data)
+        except RuntimeError:
+            return None
+
+    def _stretch_array(
+        self,
+        array: np.ndarray,
+        limits: Optional[Tuple[float, float]] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        if mask is None:
+            mask = np.isfinite(array)
+        vmin, vmax = limits if limits is not None else self._stretch_limits(array, mask)
         stretched = np.clip((array - vmin) / (vmax - vmin), 0, 1)
-        stretched[~finite] = 0
-        return stretched.astype(np.float32)
+        stretched[~mask] = 0
+        # Quantização para ponto fixo uint16 logo após o stretch: os passes
+        # seguintes leem/escrevem 2 bytes por pixel em vez de 4.
+        np.multiply(stretched, 65535.0, out=stretched)
+        return stretched.astype(np.uint16)
 
-    def _balance_channels(self, rgb: np.ndarray) -> np.ndarray:
+    def _balance_channels(self, rgb: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
         if not self.options.channel_balance:
             return rgb
-        mask = np.isfinite(rgb).all(axis=-1)
-        if not np.any(mask):
+        if mask is None:
+            mask = np.isfinite(rgb).all(axis=0)
+        valid_count = int(np.count_nonzero(mask))
+        if valid_count == 0:
+            return rgb
+        # Médias dos três canais em uma única redução; escala aplicada
+        # in-place via broadcasting, sem o rgb.copy() full-size.
+        means = np.where(mask[np.newaxis], rgb, 0.0).sum(axis=(1, 2)) / valid_count
+        target = float(means.mean())
+        scales = np.where(means > 0, target / np.where(means > 0, means, 1.0), 1.0)
+        # Canais já equilibrados: poupa o passe HxWx3 memory-bound que
+        # multiplicaria tudo por ~1.0.
+        if np.all(np.abs(scales - 1.0) < 1e-3):
             return rgb
-        means = []
-        for channel in range(rgb.shape[-1]):
-            channel_values = rgb[..., channel][mask]
-            if channel_values.size == 0:
-                means.append(1.0)
-            else:
-                means.append(float(np.mean(channel_values)))
-        target = float(np.mean(means))
-        balanced = rgb.copy()
-        for channel, mean in enumerate(means):
-            if mean <= 0:
-                continue
-            scale = target / mean
-            balanced[..., channel] *= scale
-        return balanced
+        if rgb.dtype == np.uint16:
+            # Escala em Q8.8 sobre acumulador uint32: multiplicação inteira
+            # + shift, sem promover o buffer de volta a float.
+            scales_q = np.round(scales * 256.0).astype(np.uint32)
+            scaled = (rgb.astype(np.uint32) * scales_q[:, np.newaxis, np.newaxis]) >> 8
+            np.minimum(scaled, 65535, out=scaled)
+            rgb[:] = scaled.astype(np.uint16)
+            return rgb
+        rgb *= scales.astype(rgb.dtype)[:, np.newaxis, np.newaxis]
+        return rgb
 
     def _smooth_rgb(self, rgb: np.ndarray) -> np.ndarray:
         sigma = max(self.options.smooth_radius, 0.0)
         if sigma <= 0:
             return rgb
-        smoothed = np.empty_like(rgb)
-        for channel in range(rgb.shape[-1]):
-            smoothed[..., channel] = gaussian_filter(rgb[..., channel], sigma=sigma, mode="nearest")
-        return smoothed
+        if _CV2_AVAILABLE:
+            # OpenCV usa kernels separáveis vetorizados (SIMD); cada plano
+            # (H, W) do layout channels-first é contíguo e dst=channel evita
+            # qualquer alocação.
+            ksize = int(2 * round(3 * sigma) + 1)
+            for channel in rgb:
+                cv2.GaussianBlur(
+                    channel,
+                    (ksize, ksize),
+                    sigmaX=sigma,
+                    sigmaY=sigma,
+                    borderType=cv2.BORDER_REPLICATE,
+                    dst=channel,
+                )
+            return rgb
+        # Blur gaussiano é separável: dois passes 1D in-place sobre o stack
+        # (3, H, W) inteiro tratam os três canais de uma vez, sem o buffer
+        # extra nem o loop por canal do gaussian_filter 2D.
+        gaussian_filter1d(rgb, sigma=sigma, axis=1, mode="nearest", output=rgb)
+        gaussian_filter1d(rgb, sigma=sigma, axis=2, mode="nearest", output=rgb)
+        return rgb
 
     def _boost_saturation(self, rgb: np.ndarray) -> np.ndarray:
         boost = max(self.options.saturation_boost, 0.0)
         if boost <= 0 or np.isclose(boost, 1.0):
             return rgb
-        mean = np.mean(rgb, axis=-1, keepdims=True)
+        if rgb.dtype == np.uint16:
+            # Saturação inteira: média dos canais em int32 e boost em Q8.8,
+            # clip direto no acumulador.
+            mean = (rgb[0].astype(np.int32) + rgb[1] + rgb[2]) // 3
+            boost_q = int(round(boost * 256.0))
+            enhanced = mean[np.newaxis] + (((rgb.astype(np.int32) - mean[np.newaxis]) * boost_q) >> 8)
+            np.clip(enhanced, 0, 65535, out=enhanced)
+            rgb[:] = enhanced.astype(np.uint16)
+            return rgb
+        mean = np.mean(rgb, axis=0, keepdims=True)
         enhanced = mean + (rgb - mean) * boost
         return np.clip(enhanced, 0.0, 1.0)
 
@@ -263,9 +666,54 @@ class TrueColorRenderer:
         gamma = self.options.gamma
         if gamma <= 0 or np.isclose(gamma, 1.0):
             return rgb
+        if rgb.dtype == np.uint16:
+            # Gamma vira um gather numa LUT de 65536 entradas (cacheada por
+            # gamma) em vez de um np.power transcendental por pixel.
+            return _gamma_lut_u16(float(gamma))[rgb]
         return np.power(np.clip(rgb, 0.0, 1.0), 1.0 / gamma)
 
 
+# Template Leaflet compilado uma única vez no import do módulo: o caminho
+# direto de render_html só substitui PNG, bounds e overlays por cena.
+_TRUECOLOR_TEMPLATE = jinja2.Template(
+    """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8"/>
+<meta name="viewport" content="width=device-width, initial-scale=1.0"/>
+<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.css"/>
+<script src="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.js"></script>
+<style>html, body, #map {height: 100%; width: 100%; margin: 0; padding: 0;}</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+var map = L.map("map", {
+    center: [{{ centre_lat }}, {{ centre_lon }}],
+    zoom: {{ zoom }},
+    minZoom: {{ min_zoom }},
+    maxZoom: {{ max_zoom }}
+});
+{% for layer in tile_layers %}
+L.tileLayer("{{ layer.url }}", {
+    attribution: {{ layer.attribution | tojson }},
+    maxZoom: {{ max_zoom }},
+    maxNativeZoom: {{ max_native_zoom }},
+    opacity: {{ layer.opacity }}
+}).addTo(map);
+{% endfor %}
+L.imageOverlay("{{ png_url }}", {{ bounds }}, {opacity: 1.0}).addTo(map);
+{% for geojson in overlays %}
+L.geoJSON({{ geojson }}, {style: function () { return {fillOpacity: 0}; }}).addTo(map);
+{% endfor %}
+map.fitBounds({{ bounds }});
+</script>
+</body>
+</html>
+"""
+)
+
+
 def build_truecolor_map(
     red_path: Path,
     green_path: Path,
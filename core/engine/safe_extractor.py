@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import json
 import logging
-import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 import rasterio
+from rasterio.enums import Resampling
+
+try:
+    from osgeo import gdal
+
+    _GDAL_AVAILABLE = True
+except ImportError:  # pragma: no cover - bindings osgeo sao opcionais
+    _GDAL_AVAILABLE = False
 
 DEFAULT_SENTINEL_BANDS: Dict[str, str] = {
     "B01": "coastal",
@@ -30,57 +39,170 @@ _LOGGER = logging.getLogger(__name__)
 class SafeExtractor:
     """Extrai bandas Sentinel-2 de um arquivo SAFE (zip ou pasta)."""
 
-    def __init__(self, bands: Optional[Dict[str, str]] = None) -> None:
+    def __init__(self, bands: Optional[Dict[str, str]] = None, *, convert: bool = True) -> None:
         self.bands = bands or DEFAULT_SENTINEL_BANDS
+        # convert=False emite side-cars .vrt apontando para os .jp2 originais
+        # em vez de re-codificar cada banda: zero decodificação na extração.
+        # Só vale para SAFEs em pasta (um VRT para um zip temporário penderia).
+        self.convert = convert
 
     def extract(self, safe_archive: Path, destination: Path) -> Dict[str, Path]:
         destination.mkdir(parents=True, exist_ok=True)
 
-        tmp_dir: Optional[tempfile.TemporaryDirectory[str]] = None
+        # Manifesto persistente: em re-execuções quentes evita descompactar
+        # o SAFE e varrer a árvore IMG_DATA com glob só para redescobrir
+        # bandas que já estão extraídas e atuais.
+        manifest_path = destination / "_manifest.json"
+        cached = self._load_manifest(manifest_path, safe_archive, self.bands)
+        if cached is not None:
+            _LOGGER.debug("Reusing extraction manifest at %s", manifest_path)
+            return cached
+
         if safe_archive.suffix == ".zip":
-            tmp_dir = tempfile.TemporaryDirectory(prefix="safe_")
-            tmp_path = Path(tmp_dir.name)
-            _LOGGER.info("Extracting SAFE archive %s", safe_archive)
-            with zipfile.ZipFile(safe_archive) as archive:
-                archive.extractall(tmp_path)
-            safe_root = next(tmp_path.glob("*.SAFE"))
+            # Descompacta uma única vez para um diretório estável ao lado do
+            # destino (reaproveitado em re-execuções), trazendo apenas os jp2
+            # de IMG_DATA e os MTD*.xml — QI_DATA/AUX_DATA/previews ficam de
+            # fora, ~30-50% do tamanho do arquivo.
+            stable_dir = destination.parent / f"{safe_archive.stem}_extracted"
+            safe_root = self._ensure_unzipped(safe_archive, stable_dir)
         else:
             safe_root = safe_archive
 
+        # Decodificar jp2 e escrever GTiff liberam o GIL dentro do GDAL:
+        # as 13 bandas são extraídas em paralelo por threads.
         extracted: Dict[str, Path] = {}
-        for band_id, alias in self.bands.items():
+        jobs = list(self.bands.items())
+        with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as executor:
+            futures = [
+                executor.submit(self._extract_one, safe_root, destination, band_id, alias, True)
+                for band_id, alias in jobs
+            ]
+            for future in futures:
+                alias, band_path = future.result()
+                if band_path is not None:
+                    extracted[alias] = band_path
+
+        self._write_manifest(manifest_path, safe_archive, self.bands, extracted)
+        return extracted
+
+    @classmethod
+    def _ensure_unzipped(cls, safe_archive: Path, stable_dir: Path) -> Path:
+        if stable_dir.exists():
+            existing = next(stable_dir.glob("*.SAFE"), None)
+            if existing is not None:
+                _LOGGER.debug("Reusing unzipped SAFE at %s", existing)
+                return existing
+        stable_dir.mkdir(parents=True, exist_ok=True)
+        _LOGGER.info("Extracting SAFE archive %s", safe_archive)
+        with zipfile.ZipFile(safe_archive) as archive:
+            members = [name for name in archive.namelist() if cls._is_relevant_member(name)]
+            archive.extractall(stable_dir, members=members)
+        return next(stable_dir.glob("*.SAFE"))
+
+    @staticmethod
+    def _is_relevant_member(name: str) -> bool:
+        if name.endswith("/"):
+            return False
+        if "/IMG_DATA/" in name and name.endswith(".jp2"):
+            return True
+        return name.endswith(".xml") and Path(name).name.startswith("MTD")
+
+    def _extract_one(
+        self,
+        safe_root: Path,
+        destination: Path,
+        band_id: str,
+        alias: str,
+        allow_vrt: bool,
+    ) -> Tuple[str, Optional[Path]]:
+        try:
+            jp2_path = self._locate_band(safe_root, band_id)
+        except FileNotFoundError:
+            _LOGGER.warning("Band %s not found in SAFE structure", band_id)
+            return alias, None
+
+        if not self.convert and allow_vrt and _GDAL_AVAILABLE:
+            vrt_path = destination / f"{alias}.vrt"
+            if not vrt_path.exists() or vrt_path.stat().st_mtime < jp2_path.stat().st_mtime:
+                gdal.BuildVRT(str(vrt_path), [str(jp2_path)])
+            return alias, vrt_path
+
+        tif_path = destination / f"{alias}.tif"
+        if tif_path.exists():
             try:
-                jp2_path = self._locate_band(safe_root, band_id)
-            except FileNotFoundError:
-                _LOGGER.warning("Band %s not found in SAFE structure", band_id)
-                continue
-
-            tif_path = destination / f"{alias}.tif"
-            if tif_path.exists():
-                try:
-                    tif_mtime = tif_path.stat().st_mtime
-                    jp2_mtime = jp2_path.stat().st_mtime
-                    if tif_mtime >= jp2_mtime:
-                        _LOGGER.debug("Reusing cached band %s at %s", alias, tif_path)
-                        extracted[alias] = tif_path
-                        continue
-                except OSError:
-                    pass
-
-            with rasterio.open(jp2_path) as src:
-                profile = src.profile
-                data = src.read(1)
-
-            profile.update(driver="GTiff")
-            with rasterio.open(tif_path, "w", **profile) as dst:
-                dst.write(data, 1)
+                tif_mtime = tif_path.stat().st_mtime
+                jp2_mtime = jp2_path.stat().st_mtime
+                if tif_mtime >= jp2_mtime:
+                    _LOGGER.debug("Reusing cached band %s at %s", alias, tif_path)
+                    return alias, tif_path
+            except OSError:
+                pass
+
+        with rasterio.open(jp2_path) as src:
+            profile = src.profile
+            data = src.read(1)
+
+        # Layout estilo COG: tiles internos + overviews permitem leituras
+        # janeladas baratas quando a AOI cobre fração pequena da cena.
+        profile.update(
+            driver="GTiff",
+            tiled=True,
+            blockxsize=512,
+            blockysize=512,
+            compress="deflate",
+            predictor=2,
+        )
+        with rasterio.open(tif_path, "w", **profile) as dst:
+            dst.write(data, 1)
+            dst.build_overviews([2, 4, 8, 16], Resampling.average)
+
+        return alias, tif_path
 
+    @staticmethod
+    def _load_manifest(
+        manifest_path: Path,
+        safe_archive: Path,
+        bands: Dict[str, str],
+    ) -> Optional[Dict[str, Path]]:
+        if not manifest_path.exists():
+            return None
+        try:
+            payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if payload.get("source") != str(safe_archive):
+                return None
+            if payload.get("source_mtime_ns") != safe_archive.stat().st_mtime_ns:
+                return None
+            # O manifesto só vale para o MESMO mapeamento banda->alias:
+            # um extractor construído com outras bandas precisa re-extrair.
+            if payload.get("requested_bands") != bands:
+                return None
+        except (OSError, ValueError):
+            return None
+        extracted: Dict[str, Path] = {}
+        for alias, tif in payload.get("bands", {}).items():
+            tif_path = Path(tif)
+            if not tif_path.exists():
+                return None
             extracted[alias] = tif_path
+        return extracted or None
 
-        if tmp_dir is not None:
-            tmp_dir.cleanup()
-
-        return extracted
+    @staticmethod
+    def _write_manifest(
+        manifest_path: Path,
+        safe_archive: Path,
+        bands: Dict[str, str],
+        extracted: Dict[str, Path],
+    ) -> None:
+        try:
+            payload = {
+                "source": str(safe_archive),
+                "source_mtime_ns": safe_archive.stat().st_mtime_ns,
+                "requested_bands": bands,
+                "bands": {alias: str(path) for alias, path in extracted.items()},
+            }
+            manifest_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        except OSError:
+            _LOGGER.warning("Could not persist extraction manifest at %s", manifest_path)
 
     @staticmethod
     def _locate_band(safe_root: Path, band: str) -> Path:
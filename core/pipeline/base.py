@@ -24,7 +24,10 @@ class Pipeline:
         self.steps: List[PipelineStep] = list(steps)
 
     def run(self, context: WorkflowContext) -> WorkflowContext:
-        for step in self.steps:
-            step.run(context)
+        # Métodos resolvidos uma única vez: dispensa o lookup de atributo
+        # (e o dispatch virtual) por iteração.
+        runners = [step.run for step in self.steps]
+        for runner in runners:
+            runner(context)
         return context
 
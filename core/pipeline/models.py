@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
@@ -9,6 +10,12 @@ from core.cfg.settings import AppConfig
 from core.domain import AreaOfInterest
 
 
+@lru_cache(maxsize=8)
+def _load_aoi(aoi_path: Path, _mtime_ns: int) -> AreaOfInterest:
+    """Carrega a AOI memoizada por (caminho, mtime) entre execuções."""
+    return AreaOfInterest.from_geojson(aoi_path)
+
+
 @dataclass(frozen=True)
 class WorkflowParameters:
     """Parâmetros imutáveis utilizados para executar o workflow."""
@@ -43,7 +50,9 @@ class WorkflowContext:
     maps: List[Path] = field(default_factory=list)
 
     def __post_init__(self) -> None:
-        self.aoi = AreaOfInterest.from_geojson(self.params.aoi_path)
+        # Cada construção de contexto reaproveita a AOI já parseada; o
+        # mtime na chave invalida o cache quando o GeoJSON muda em disco.
+        self.aoi = _load_aoi(self.params.aoi_path, self.params.aoi_path.stat().st_mtime_ns)
 
     def register_map(self, path: Path) -> None:
         self.maps.append(path)
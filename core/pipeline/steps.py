@@ -49,7 +49,9 @@ class ResolveProductStep(PipelineStep):
             if not product:
                 raise RuntimeError("Nenhum produto Sentinel-2 encontrado para os parâmetros informados.")
 
-            product_path = self.client.download(session, product, download_dir)
+            # download_parallel recai sozinho no download sequencial quando
+            # o HEAD falha, o servidor não aceita ranges ou um range-GET erra.
+            product_path = self.client.download_parallel(session, product, download_dir)
         context.product_path = product_path
         context.product_title = CopernicusClient.infer_product_name(product_path)
         _LOGGER.info("Produto selecionado: %s", context.product_title)
@@ -103,9 +105,14 @@ class RenderMultiIndexStep(PipelineStep):
         if not context.indices:
             raise RuntimeError("Nenhum índice disponível para renderização.")
 
+        if context.product_title is None:
+            raise RuntimeError("Produto ainda não foi resolvido.")
+
         output_dir = context.config.MAPAS_DIR
         output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / "compare_indices_all.html"
+        # Nome por produto: execuções concorrentes (um subprocesso por dia
+        # no run_workflow) não podem disputar um mesmo arquivo fixo.
+        output_path = output_dir / f"compare_indices_{context.product_title}.html"
         overlays = [context.params.aoi_path]
         index_paths = [path for _, path in sorted(context.indices.items())]
 
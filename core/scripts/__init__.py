@@ -0,0 +1,15 @@
+"""Helpers compartilhados pelos scripts de linha de comando."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def resolve_path(path: Path) -> Path:
+    """Expande ~ e canonicaliza o caminho em uma única chamada de realpath.
+
+    Path.resolve() faz o percurso componente a componente com vários stats
+    intermediários; os.path.realpath entrega o mesmo resultado em uma
+    passada, o que soma nos fluxos que resolvem vários caminhos por data.
+    """
+    return Path(os.path.realpath(os.path.expanduser(str(path))))
@@ -6,6 +6,7 @@ from typing import Iterable, Optional
 
 from core.cfg.settings import AppConfig
 from core.engine.renderers.csv_map import CSVMapOptions, CSVMapRenderer
+from core.scripts import resolve_path
 
 
 def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
@@ -175,20 +176,20 @@ def build_options(args: argparse.Namespace) -> CSVMapOptions:
 
 
 def resolve_paths(args: argparse.Namespace, cfg: AppConfig) -> tuple[Path, Path, Optional[Path]]:
-    csv_path = args.csv.expanduser().resolve()
+    csv_path = resolve_path(args.csv)
     if not csv_path.exists():
         raise FileNotFoundError(f"CSV não encontrado: {csv_path}")
 
     output_path = (
-        args.output.expanduser().resolve()
+        resolve_path(args.output)
         if args.output
-        else (cfg.MAPAS_DIR / f"{csv_path.stem}_csv_map.html").resolve()
+        else resolve_path(cfg.MAPAS_DIR / f"{csv_path.stem}_csv_map.html")
     )
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     geojson_path: Optional[Path] = None
     if not args.no_geojson and args.geojson is not None:
-        geojson_path = args.geojson.expanduser().resolve()
+        geojson_path = resolve_path(args.geojson)
         if not geojson_path.exists():
             raise FileNotFoundError(f"GeoJSON não encontrado: {geojson_path}")
 
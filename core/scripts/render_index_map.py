@@ -4,8 +4,47 @@ import argparse
 from pathlib import Path
 from typing import Iterable, Optional
 
+import rasterio
+from rasterio.enums import Resampling
+
 from core.cfg.settings import AppConfig
 from core.engine.renderers.index_map import IndexMapOptions, IndexMapRenderer
+from core.scripts import resolve_path
+
+
+def _ensure_cog(path: Path) -> Path:
+    """Garante layout COG (tiles internos + overviews) para o raster.
+
+    Rasters já tiled e com overviews passam direto; caso contrário uma
+    cópia é escrita uma vez em um subdiretório .cog/ (revalidada por
+    mtime), com o MESMO nome de arquivo — o stem alimenta os nomes de
+    saída e o rótulo da camada, então não pode mudar. Qualquer falha
+    devolve o caminho original.
+    """
+    try:
+        with rasterio.open(path) as src:
+            profile = src.profile
+            if profile.get("tiled") and src.overviews(1):
+                return path
+            cog_path = path.parent / ".cog" / path.name
+            if cog_path.exists() and cog_path.stat().st_mtime >= path.stat().st_mtime:
+                return cog_path
+            cog_path.parent.mkdir(parents=True, exist_ok=True)
+            data = src.read()
+            profile.update(
+                driver="GTiff",
+                tiled=True,
+                blockxsize=512,
+                blockysize=512,
+                compress="deflate",
+                predictor=3 if str(profile.get("dtype", "")).startswith("float") else 2,
+            )
+        with rasterio.open(cog_path, "w", **profile) as dst:
+            dst.write(data)
+            dst.build_overviews([2, 4, 8, 16], Resampling.average)
+    except Exception:
+        return path
+    return cog_path
 
 
 def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
@@ -187,28 +226,32 @@ def build_options(args: argparse.Namespace) -> IndexMapOptions:
 
 
 def resolve_paths(args: argparse.Namespace, cfg: AppConfig) -> tuple[Path, Path, Optional[Path], Optional[Path]]:
-    index_path = args.index.expanduser().resolve()
+    index_path = resolve_path(args.index)
     if not index_path.exists():
         raise FileNotFoundError(f"Index raster not found: {index_path}")
+    # Nomes default derivados do stem ORIGINAL: a conversão para COG não
+    # pode renomear os artefatos visíveis (HTML, CSV, rótulo da camada).
+    source_stem = index_path.stem
+    index_path = _ensure_cog(index_path)
 
     output_html = (
-        args.output.expanduser().resolve()
+        resolve_path(args.output)
         if args.output
-        else (cfg.MAPAS_DIR / f"{index_path.stem}_map.html").resolve()
+        else resolve_path(cfg.MAPAS_DIR / f"{source_stem}_map.html")
     )
     output_html.parent.mkdir(parents=True, exist_ok=True)
 
     csv_path: Optional[Path] = None
     if args.csv:
         if args.csv == "auto":
-            csv_path = (cfg.TABELAS_DIR / f"{index_path.stem}.csv").resolve()
+            csv_path = resolve_path(cfg.TABELAS_DIR / f"{source_stem}.csv")
         else:
-            csv_path = Path(args.csv).expanduser().resolve()
+            csv_path = resolve_path(Path(args.csv))
         csv_path.parent.mkdir(parents=True, exist_ok=True)
 
     geojson_path: Optional[Path] = None
     if not args.no_geojson and args.geojson is not None:
-        geojson_path = args.geojson.expanduser().resolve()
+        geojson_path = resolve_path(args.geojson)
         if not geojson_path.exists():
             raise FileNotFoundError(f"GeoJSON overlay not found: {geojson_path}")
 
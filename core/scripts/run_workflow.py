@@ -1,11 +1,17 @@
 from __future__ import annotations
 import argparse
 import logging
-from datetime import date, datetime
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import partial
 from pathlib import Path
-from typing import Optional, Sequence, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 
-from core.engine.facade import WorkflowService
+from core.engine.facade import WorkflowResult, WorkflowService
+from core.scripts import resolve_path
+
+_LOGGER = logging.getLogger(__name__)
 
 
 def _parse_date(value: str) -> date:
@@ -59,10 +65,30 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser.add_argument("--sharpen-radius", type=float, default=1.2, help="Raio do filtro de nitidez.")
     parser.add_argument("--sharpen-amount", type=float, default=1.5, help="Intensidade da nitidez.")
     parser.add_argument("--safe-path", type=Path, help="Arquivo ou diretório SAFE já baixado.")
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Processos paralelos para --date-range (default: min(4, nº de dias)).",
+    )
     parser.add_argument("--log-level", default="INFO", help="Nível de log (DEBUG, INFO, WARNING, ...).")
     return parser.parse_args(argv)
 
 
+def _run_single_day(day: date, *, kwargs: Dict) -> Optional[WorkflowResult]:
+    """Executa o workflow de um único dia (picklável para subprocessos).
+
+    Dias sem produto elegível não derrubam o intervalo inteiro: o erro é
+    registrado e o dia devolve None.
+    """
+    service = WorkflowService()
+    try:
+        return service.run_date_range(start=day, end=day, **kwargs)
+    except Exception:  # noqa: BLE001 - um dia ruim não cancela os demais
+        _LOGGER.warning("Workflow falhou para %s; dia ignorado.", day, exc_info=True)
+        return None
+
+
 def main(argv: Optional[Sequence[str]] = None) -> None:
     args = parse_args(argv)
     log_level = getattr(logging, str(args.log_level).upper(), logging.INFO)
@@ -70,11 +96,8 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
 
     start_date, end_date = _resolve_dates(args)
     cloud_tuple = tuple(int(v) for v in args.cloud)  # type: ignore[arg-type]
-    service = WorkflowService()
-    result = service.run_date_range(
-        start=start_date,
-        end=end_date,
-        aoi_geojson=args.geojson.expanduser().resolve(),
+    run_kwargs = dict(
+        aoi_geojson=resolve_path(args.geojson),
         cloud=cloud_tuple,  # type: ignore[arg-type]
         indices=args.indices,
         upsample=max(args.upsample, 1.0),
@@ -84,18 +107,38 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
         sharpen_amount=args.sharpen_amount,
         tiles=args.tiles,
         padding=args.padding,
-        safe_path=args.safe_path.expanduser().resolve() if args.safe_path else None,
+        safe_path=resolve_path(args.safe_path) if args.safe_path else None,
     )
 
-    print(f"Produto: {result.product_title}")
-    if result.maps:
-        print("Mapas gerados:")
-        for path in result.maps:
-            print(f" - {path}")
-    if result.indices:
-        print("Índices disponíveis:")
-        for name, path in sorted(result.indices.items()):
-            print(f" - {name}: {path}")
+    if start_date == end_date:
+        results = [WorkflowService().run_date_range(start=start_date, end=end_date, **run_kwargs)]
+    else:
+        # Cada dia é uma cadeia independente (download I/O + índices/mapas
+        # CPU): subprocessos sobrepõem as fases, limitados por --max-workers
+        # para não saturar o download.
+        days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+        max_workers = args.max_workers or min(4, len(days))
+        max_workers = max(1, min(max_workers, len(days), os.cpu_count() or 1))
+        worker = partial(_run_single_day, kwargs=run_kwargs)
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                outcomes = list(executor.map(worker, days, chunksize=1))
+        else:
+            outcomes = [worker(day) for day in days]
+        results = [outcome for outcome in outcomes if outcome is not None]
+        if not results:
+            raise RuntimeError("Nenhum dia do intervalo produziu resultado.")
+
+    for result in results:
+        print(f"Produto: {result.product_title}")
+        if result.maps:
+            print("Mapas gerados:")
+            for path in result.maps:
+                print(f" - {path}")
+        if result.indices:
+            print("Índices disponíveis:")
+            for name, path in sorted(result.indices.items()):
+                print(f" - {name}: {path}")
 
 
 if __name__ == "__main__":